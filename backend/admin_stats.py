@@ -0,0 +1,69 @@
+"""Aggregated counts of contact submissions and status checks.
+
+Each collection is read with one aggregation over a time window. The
+pipeline only needs ``timestamp`` and the grouping field, so the
+timestamp_type and timestamp_client_name indexes answer it as a covered
+query, without fetching documents. It returns one row per group and day,
+and the per-group, per-day and total counts are rolled up from those rows.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import List
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def window_pipeline(since: datetime, until: datetime, field: str, default=None) -> List[dict]:
+    """Count documents per ``field`` value and UTC day within [since, until)"""
+    value = {"$ifNull": [f"${field}", default]} if default is not None else f"${field}"
+    return [
+        {"$match": {"timestamp": {"$gte": since, "$lt": until}}},
+        {"$project": {"_id": 0, "timestamp": 1, field: 1}},
+        {"$group": {
+            "_id": {"key": value, "day": {"$dateToString": {"format": DAY_FORMAT, "date": "$timestamp"}}},
+            "count": {"$sum": 1},
+            "latest": {"$max": "$timestamp"},
+        }},
+    ]
+
+
+def contact_pipeline(since: datetime, until: datetime) -> List[dict]:
+    return window_pipeline(since, until, "type", default="general")
+
+
+def status_pipeline(since: datetime, until: datetime) -> List[dict]:
+    return window_pipeline(since, until, "client_name")
+
+
+def roll_up(rows: List[dict], key_name: str) -> dict:
+    """Totals per key, per day and per key and day from the pipeline rows"""
+    by_key, by_day = defaultdict(int), defaultdict(int)
+    latest = {}
+    by_key_day = []
+    for row in rows:
+        key, day, count = row["_id"]["key"], row["_id"]["day"], row["count"]
+        by_key[key] += count
+        by_day[day] += count
+        latest[key] = max(latest.get(key, row["latest"]), row["latest"])
+        by_key_day.append({key_name: key, "day": day, "count": count})
+    by_key_day.sort(key=lambda entry: (entry["day"], entry[key_name]))
+    return {
+        "total": sum(by_key.values()),
+        # Largest first, like the facet counts
+        f"by_{key_name}": [
+            {key_name: key, "count": count, "latest": latest[key]}
+            for key, count in sorted(by_key.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "by_day": [{"day": day, "count": by_day[day]} for day in sorted(by_day)],
+        f"by_{key_name}_day": by_key_day,
+    }
+
+
+async def contact_stats(db, since: datetime, until: datetime) -> dict:
+    rows = await db.contact_submissions.aggregate(contact_pipeline(since, until)).to_list(None)
+    return roll_up(rows, "type")
+
+
+async def status_stats(db, since: datetime, until: datetime) -> dict:
+    rows = await db.status_checks.aggregate(status_pipeline(since, until)).to_list(None)
+    return roll_up(rows, "client_name")
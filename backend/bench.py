@@ -0,0 +1,224 @@
+"""Load-test the API in-process and report throughput and latency as JSON.
+
+    python bench.py --in-memory                      # mongomock-motor stand-in
+    python bench.py --mongo-url mongodb://localhost:27017 --posts 5000
+    python bench.py --in-memory --workloads list,get -o bench.json
+
+The app is driven through httpx's ASGI transport, so no network or
+running server is involved. With --mongo-url a throwaway database
+(``--db-name``) is dropped, seeded and dropped again.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+CATEGORIES = ["Research", "Personal", "Industry", "News"]
+WORDS = ("climate model data learning quantum research network graph analysis "
+         "teaching conference paper theory experiment result method").split()
+
+
+def make_post(i: int) -> dict:
+    rng = random.Random(i)
+    return {
+        "title": f"Benchmark post {i}: " + " ".join(rng.choices(WORDS, k=5)),
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "excerpt": " ".join(rng.choices(WORDS, k=25)),
+        "content": "\n\n".join(" ".join(rng.choices(WORDS, k=120)) for _ in range(8)),
+        "tags": rng.sample(WORDS, 3),
+    }
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_workload(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    """Issue ``requests`` calls of ``make_request(i)`` with ``concurrency`` workers"""
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def build_workloads(post_ids: list) -> dict:
+    async def list_posts(client, i):
+        return await client.get("/api/blog/posts", params={"limit": 20})
+
+    async def list_summary(client, i):
+        return await client.get("/api/blog/posts", params={"limit": 20, "view": "summary"})
+
+    async def filter_category(client, i):
+        return await client.get("/api/blog/posts", params={"category": CATEGORIES[i % len(CATEGORIES)], "limit": 20})
+
+    async def get_post(client, i):
+        return await client.get(f"/api/blog/posts/{post_ids[i % len(post_ids)]}")
+
+    async def write_mix(client, i):
+        # create, update, delete in turn on posts this workload owns
+        step = i % 3
+        if step == 0:
+            response = await client.post("/api/blog/posts", json=make_post(10 ** 6 + i))
+            if response.status_code == 200:
+                write_mix.owned.append(response.json()["id"])
+            return response
+        if step == 1 and write_mix.owned:
+            return await client.put(f"/api/blog/posts/{write_mix.owned[-1]}", json={"title": f"Edited {i}"})
+        if write_mix.owned:
+            return await client.delete(f"/api/blog/posts/{write_mix.owned.pop()}")
+        return await client.get("/api/blog/categories")
+    write_mix.owned = []
+
+    async def contact_burst(client, i):
+        return await client.post("/api/contact", json={
+            "name": f"Visitor {i}",
+            "email": f"visitor{i}@example.com",
+            "subject": "Benchmark",
+            "message": f"Message number {i}",
+        })
+
+    return {
+        "list": list_posts,
+        "list_summary": list_summary,
+        "filter_category": filter_category,
+        "get": get_post,
+        "write_mix": write_mix,
+        "contact_burst": contact_burst,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main_async(args) -> dict:
+    # Keep rate limiting and contact dedup out of the way of the measurements;
+    # these must be set before server.py is imported. They are set here rather
+    # than at import time so that importing this module (startup_bench.py does)
+    # leaves the environment alone.
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "portfolio_bench")
+    os.environ.setdefault("RATE_LIMIT_BURST", str(10 ** 9))
+    os.environ.setdefault("CONTACT_DEDUP_SECONDS", "0")
+    sys.path.insert(0, str(Path(__file__).parent))
+    import server
+    from indexes import ensure_indexes
+    from post_fields import derive
+
+    # httpx logs every request at INFO, which would swamp the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        db = AsyncMongoMockClient()[args.db_name]
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db = AsyncIOMotorClient(args.mongo_url)[args.db_name]
+        await db.client.drop_database(args.db_name)
+        await ensure_indexes(db)
+    server.db = server.read_db = db
+
+    # Seed straight into the collection so setup time does not skew results
+    docs = []
+    now = server.utcnow_ms()
+    for i in range(args.posts):
+        post = make_post(i)
+        post.update(derive(post["content"], post["excerpt"]))
+        post.update(date=now, updatedAt=now, revision=1, author="Benchmark")
+        docs.append(post)
+    if docs:
+        await db.blog_posts.insert_many(docs)
+    post_ids = [str(doc["_id"]) for doc in docs]
+
+    await server.contact_writer.start(db.contact_submissions)
+    workloads = build_workloads(post_ids)
+    selected = args.workloads.split(",") if args.workloads else list(workloads)
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in selected:
+                if name not in workloads:
+                    raise SystemExit(f"unknown workload {name!r}; choose from {', '.join(workloads)}")
+                # Warm up caches and code paths before measuring
+                await run_workload(client, workloads[name], min(args.requests, 50), args.concurrency)
+                results[name] = await run_workload(client, workloads[name], args.requests, args.concurrency)
+    finally:
+        await server.contact_writer.stop()
+        if not args.in_memory:
+            await db.client.drop_database(args.db_name)
+
+    return {
+        "commit": git_commit(),
+        "backend": "mongomock" if args.in_memory else args.mongo_url,
+        "posts": args.posts,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    backend = parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument("--in-memory", action="store_true", help="use a mongomock-motor stand-in")
+    backend.add_argument("--mongo-url", help="local mongod to run against")
+    parser.add_argument("--db-name", default="portfolio_bench", help="throwaway database name")
+    parser.add_argument("--posts", type=int, default=1000, help="posts to seed")
+    parser.add_argument("--requests", type=int, default=500, help="requests per workload")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--workloads", help="comma-separated subset of workloads to run")
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main_async(args)), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
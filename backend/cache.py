@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    Every entry carries a set of tags so writes can evict exactly the
+    entries they affect via ``invalidate``.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tags: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = ()) -> None:
+        if key in self._entries:
+            self._remove(key)
+        tags = frozenset(tags)
+        self._entries[key] = (value, time.monotonic() + self.ttl, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of ``tags``; returns how many were dropped"""
+        keys = set()
+        for tag in tags:
+            keys |= self._tags.get(tag, set())
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
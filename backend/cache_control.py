@@ -0,0 +1,50 @@
+"""Cache-Control headers chosen per route.
+
+Successful GET/HEAD responses of routes listed in ``policies`` carry that
+route's policy, including 304s so caches refresh their freshness
+lifetime. Responses to every other method are marked ``no-store``.
+Headers a route sets itself are left alone.
+"""
+from typing import Dict, Optional
+
+CACHEABLE_STATUSES = (200, 203, 304)
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def cache_policy(max_age: int, stale_while_revalidate: int = 0, public: bool = True) -> str:
+    parts = ["public" if public else "private", f"max-age={max_age}"]
+    if stale_while_revalidate:
+        parts.append(f"stale-while-revalidate={stale_while_revalidate}")
+    return ", ".join(parts)
+
+
+class CacheControlMiddleware:
+    """ASGI middleware adding Cache-Control by route template, e.g. ``/api/blog/posts/{post_id}``"""
+
+    def __init__(self, app, policies: Dict[str, str], write_policy: Optional[str] = "no-store"):
+        self.app = app
+        self.policies = policies
+        self.write_policy = write_policy
+
+    def _policy(self, scope, status: int) -> Optional[str]:
+        if scope["method"] not in SAFE_METHODS:
+            return self.write_policy
+        if status not in CACHEABLE_STATUSES:
+            return None
+        route = scope.get("route")
+        return self.policies.get(getattr(route, "path", None))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                policy = self._policy(scope, message["status"])
+                if policy and not any(name == b"cache-control" for name, _ in headers):
+                    message = dict(message, headers=list(headers) + [(b"cache-control", policy.encode())])
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,84 @@
+"""Command line tools for the portfolio API.
+
+    python cli.py import-posts posts.ndjson
+    python cli.py import-posts ../frontend/src/data/blog.json
+    python cli.py export-posts -o posts.ndjson
+"""
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import requests
+import typer
+
+app = typer.Typer(help="Bulk import and export for the portfolio API.")
+
+DEFAULT_API_URL = os.environ.get("BACKEND_API_URL", "http://localhost:8001/api")
+
+
+def read_posts(path: Path) -> Iterator[dict]:
+    """Yield posts from a blog.json style {"posts": [...]} file or from NDJSON"""
+    with path.open(encoding="utf-8") as f:
+        if path.suffix == ".json":
+            data = json.load(f)
+            yield from data["posts"] if isinstance(data, dict) else data
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(items: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@app.command("import-posts")
+def import_posts(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="NDJSON or blog.json file"),
+    api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API, including /api"),
+    batch_size: int = typer.Option(500, min=1, help="Posts per bulk request"),
+):
+    """Import posts through POST /blog/posts/bulk in batches."""
+    inserted = failed = 0
+    with requests.Session() as session:
+        for batch_number, batch in enumerate(batched(read_posts(path), batch_size)):
+            response = session.post(f"{api_url}/blog/posts/bulk", json=batch)
+            response.raise_for_status()
+            result = response.json()
+            inserted += result["inserted"]
+            for error in result["errors"]:
+                failed += 1
+                typer.echo(f"post {batch_number * batch_size + error['index']}: {error['message']}", err=True)
+    typer.echo(f"Imported {inserted} posts, {failed} failed")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command("export-posts")
+def export_posts(
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="File to write; stdout if omitted"),
+    api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API, including /api"),
+):
+    """Stream every post from GET /blog/export as NDJSON."""
+    with requests.get(f"{api_url}/blog/export", stream=True) as response:
+        response.raise_for_status()
+        out = output.open("wb") if output else sys.stdout.buffer
+        try:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                out.write(chunk)
+        finally:
+            if output:
+                out.close()
+
+
+if __name__ == "__main__":
+    app()
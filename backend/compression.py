@@ -0,0 +1,167 @@
+"""Response compression negotiated from Accept-Encoding.
+
+Brotli is used when the ``brotli`` package is installed and the client
+accepts it, gzip otherwise. Complete bodies smaller than ``minimum_size``
+are sent as they are; streamed bodies are compressed chunk by chunk.
+"""
+import zlib
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "text/")
+# Event streams must reach the client event by event, not in compressor-sized blocks
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _weak(etag: bytes) -> bytes:
+    # The encoded body differs byte for byte from the identity one, so they
+    # must not share a strong validator (RFC 9110, section 8.8.3)
+    return etag if etag.startswith(b"W/") else b"W/" + etag
+
+
+class _Gzip:
+    encoding = b"gzip"
+
+    def __init__(self, level: int):
+        # wbits=31 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    encoding = b"br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing text-like responses with brotli or gzip"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 content_types: Iterable[str] = COMPRESSIBLE_TYPES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(content_types)
+
+    def _compressor(self, scope) -> Optional[object]:
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = _accepted_encodings(value.decode("latin-1"))
+                break
+        else:
+            return None
+        if brotli is not None and "br" in accepted:
+            return _Brotli(self.brotli_quality)
+        if "gzip" in accepted:
+            return _Gzip(self.gzip_level)
+        return None
+
+    def _compressible(self, headers) -> bool:
+        content_type = encoding = ""
+        for name, value in headers:
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+            elif name == b"content-encoding":
+                encoding = value.decode("latin-1")
+        if encoding or not content_type or content_type.startswith(UNCOMPRESSIBLE_TYPES):
+            return False
+        return content_type.startswith(self.content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        compressor = self._compressor(scope)
+        if compressor is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressing = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressing
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows the response size
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not compressing:
+                headers = start["headers"]
+                small = not more_body and len(body) < max(self.minimum_size, 1)
+                if small or not self._compressible(headers):
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                compressing = True
+                vary = [value for name, value in headers if name == b"vary"]
+                headers = [
+                    (name, _weak(value) if name == b"etag" else value)
+                    for name, value in headers if name not in (b"content-length", b"vary")
+                ]
+                headers.append((b"content-encoding", compressor.encoding))
+                headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send(dict(start, headers=headers))
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(dict(start, headers=headers))
+
+            if more_body:
+                # Flush per chunk so streamed lines are not held back indefinitely
+                chunk = compressor.compress(body) + compressor.flush()
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.compress(body) + compressor.finish()})
+
+        await self.app(scope, receive, send_wrapper)
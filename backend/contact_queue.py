@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """Bounded in-process queue that writes documents with insert_many.
+
+    ``submit`` never waits: it returns False when the queue is full so the
+    caller can shed load. A background task flushes a batch once it holds
+    ``batch_size`` documents or ``flush_interval`` seconds have passed
+    since its first document, and ``stop`` drains whatever is left. At
+    most ``max_queue`` plus one batch of documents are held in memory.
+    """
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 100,
+                 flush_interval: float = 0.5, max_attempts: int = 3):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._collection = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def submit(self, doc: dict) -> bool:
+        try:
+            self.queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def start(self, collection) -> None:
+        self._collection = collection
+        if self.queue.empty():
+            # A queue is tied to the event loop it was first used on; a new
+            # app lifespan (another worker loop, a test client) gets a fresh one
+            self.queue = asyncio.Queue(maxsize=self.queue.maxsize)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush every queued document, then stop the background task"""
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
+
+    async def _run(self) -> None:
+        while not (self._stopping and self.queue.empty()):
+            batch = await self._next_batch()
+            if batch:
+                await self._write(batch)
+
+    async def _next_batch(self) -> List[dict]:
+        if self._stopping:
+            return self._drain(self.batch_size)
+        try:
+            # Wake up periodically so a stop request is noticed on an idle queue
+            first = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stopping:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        batch += self._drain(self.batch_size - len(batch))
+        return batch
+
+    def _drain(self, count: int) -> List[dict]:
+        items = []
+        while len(items) < count and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def _write(self, batch: List[dict]) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self._collection.insert_many(batch, ordered=False)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except BulkWriteError as e:
+                # Unordered: everything except the reported documents was written.
+                # On a retry, duplicate keys are documents the failed attempt already wrote.
+                errors = [
+                    error for error in e.details.get("writeErrors", [])
+                    if not (attempt > 1 and error.get("code") == 11000)
+                ]
+                if not errors:
+                    self.written += len(batch)
+                    self.batches += 1
+                    return
+                self.written += len(batch) - len(errors)
+                self.failed += len(errors)
+                self.batches += 1
+                logger.error("Dropped %d of %d queued documents: %s", len(errors), len(batch), errors[:1])
+                return
+            except PyMongoError as e:
+                if attempt == self.max_attempts:
+                    self.failed += len(batch)
+                    logger.error("Dropped batch of %d queued documents after %d attempts: %s", len(batch), attempt, e)
+                    return
+                logger.warning("Batch insert failed (attempt %d), retrying: %s", attempt, e)
+                await asyncio.sleep(0.1 * 2 ** attempt)
@@ -0,0 +1,159 @@
+"""Materialized post counts per category and per tag.
+
+The blog_facets collection holds one document per category and per tag:
+
+    {"_id": "category:Research", "kind": "category", "name": "Research",
+     "count": 12, "latest": <date of the newest post>}
+
+The write routes keep it current with $inc/$max upserts. Run
+``python facets.py --rebuild`` to recompute it from blog_posts if it
+ever drifts.
+"""
+import argparse
+import asyncio
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+from dotenv import load_dotenv
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+
+KINDS = {"category": "category", "tag": "tags"}
+
+
+def _facets_of(post: dict) -> Iterable[tuple]:
+    yield "category", post["category"]
+    for tag in set(post.get("tags") or []):
+        yield "tag", tag
+
+
+def _entries(posts: Iterable[dict]) -> Iterable[tuple]:
+    for post in posts:
+        for kind, name in _facets_of(post):
+            yield kind, name, post["date"]
+
+
+def _facet_id(kind: str, name: str) -> str:
+    return f"{kind}:{name}"
+
+
+def _tally(entries: Iterable[tuple]):
+    counts, latest = defaultdict(int), {}
+    for kind, name, date in entries:
+        counts[(kind, name)] += 1
+        latest[(kind, name)] = max(latest.get((kind, name), date), date)
+    return counts, latest
+
+
+async def _increment(db, entries: Iterable[tuple]) -> None:
+    counts, latest = _tally(entries)
+    if not counts:
+        return
+    await db.blog_facets.bulk_write([
+        UpdateOne(
+            {"_id": _facet_id(kind, name)},
+            {"$inc": {"count": count}, "$max": {"latest": latest[(kind, name)]},
+             "$setOnInsert": {"kind": kind, "name": name}},
+            upsert=True,
+        )
+        for (kind, name), count in counts.items()
+    ], ordered=False)
+
+
+async def _decrement(db, entries: Iterable[tuple]) -> None:
+    counts, latest = _tally(entries)
+    for (kind, name), count in counts.items():
+        facet = await db.blog_facets.find_one_and_update(
+            {"_id": _facet_id(kind, name)},
+            {"$inc": {"count": -count}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if facet is None:
+            continue
+        if facet["count"] <= 0:
+            await db.blog_facets.delete_one({"_id": facet["_id"], "count": {"$lte": 0}})
+        elif facet.get("latest") is not None and facet["latest"] <= latest[(kind, name)]:
+            # The newest post may be gone; find the next one through the index
+            newest = await db.blog_posts.find_one({KINDS[kind]: name}, {"date": 1}, sort=[("date", -1)])
+            if newest is not None:
+                await db.blog_facets.update_one({"_id": facet["_id"]}, {"$set": {"latest": newest["date"]}})
+
+
+async def posts_added(db, posts: Iterable[dict]) -> None:
+    await _increment(db, _entries(posts))
+
+
+async def posts_removed(db, posts: Iterable[dict]) -> None:
+    await _decrement(db, _entries(posts))
+
+
+async def post_changed(db, before: dict, after: dict) -> None:
+    """Move counts between facets when an update changes category or tags"""
+    old, new = set(_facets_of(before)), set(_facets_of(after))
+    if old == new:
+        return
+    await _decrement(db, [(kind, name, before["date"]) for kind, name in old - new])
+    await _increment(db, [(kind, name, after["date"]) for kind, name in new - old])
+
+
+async def list_facets(db) -> dict:
+    """Facets grouped by kind, largest first"""
+    grouped = {"categories": [], "tags": []}
+    async for facet in db.blog_facets.find().sort([("kind", 1), ("count", -1), ("name", 1)]):
+        key = "categories" if facet["kind"] == "category" else "tags"
+        grouped[key].append({"name": facet["name"], "count": facet["count"], "latest": facet.get("latest")})
+    return grouped
+
+
+async def rebuild(db) -> int:
+    """Recompute blog_facets from blog_posts; returns the number of facets"""
+    pipelines = {
+        "category": [{"$group": {"_id": "$category", "count": {"$sum": 1}, "latest": {"$max": "$date"}}}],
+        "tag": [
+            # Counted once per post even if a tag is repeated within it
+            {"$project": {"date": 1, "tags": {"$setUnion": [{"$ifNull": ["$tags", []]}]}}},
+            {"$unwind": "$tags"},
+            {"$group": {"_id": "$tags", "count": {"$sum": 1}, "latest": {"$max": "$date"}}},
+        ],
+    }
+    fresh = {}
+    for kind, pipeline in pipelines.items():
+        async for row in db.blog_posts.aggregate(pipeline):
+            fresh[_facet_id(kind, row["_id"])] = {
+                "_id": _facet_id(kind, row["_id"]), "kind": kind, "name": row["_id"],
+                "count": row["count"], "latest": row["latest"],
+            }
+    existing = {doc["_id"] async for doc in db.blog_facets.find({}, {"_id": 1})}
+    requests = [DeleteOne({"_id": facet_id}) for facet_id in existing - set(fresh)]
+    requests += [
+        UpdateOne({"_id": facet_id}, {"$set": doc}, upsert=True) if facet_id in existing else InsertOne(doc)
+        for facet_id, doc in fresh.items()
+    ]
+    if requests:
+        await db.blog_facets.bulk_write(requests, ordered=False)
+    return len(fresh)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="recompute every facet from blog_posts")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        count = asyncio.run(rebuild(db))
+    finally:
+        client.close()
+    print(f"Rebuilt {count} facets")
+
+
+if __name__ == "__main__":
+    main()
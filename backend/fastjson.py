@@ -0,0 +1,67 @@
+"""Direct JSON encoding of Mongo documents for large responses.
+
+FastAPI validates every item of a ``response_model=List[...]`` return value
+and then serializes it. For listings built from documents that already
+have the model's shape, ``FastJSONResponse`` skips that work: documents are
+reduced to the model's fields (with its defaults filled in) and encoded in
+one call, with orjson when it is installed and the stdlib otherwise.
+"""
+import json
+from datetime import datetime
+from typing import Any, Callable, Type
+
+from bson import ObjectId
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        # orjson encodes naive datetimes the same way Pydantic does
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def shaper(model: Type[BaseModel]) -> Callable[[dict], dict]:
+    """Return a function mapping a document onto ``model``'s fields in declaration order"""
+    fields = []
+    for name, field in model.model_fields.items():
+        if field.default_factory is not None:
+            fields.append((name, None, field.default_factory))
+        elif field.default is not PydanticUndefined:
+            fields.append((name, field.default, None))
+        else:
+            fields.append((name, None, None))
+
+    def shape(doc: dict) -> dict:
+        out = {}
+        for name, default, factory in fields:
+            if name in doc:
+                out[name] = doc[name]
+            else:
+                out[name] = factory() if factory is not None else default
+        return out
+
+    return shape
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
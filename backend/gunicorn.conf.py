@@ -0,0 +1,27 @@
+"""Multi-worker deployment: one Uvicorn worker process per core.
+
+    gunicorn -c gunicorn.conf.py "server:create_app()"
+
+Each worker builds its own Mongo client and read cache in the app
+lifespan, after the fork. Post writes in one worker reach the caches of
+the others through the invalidation bus (invalidation.py), which this
+config turns on. Per-process state that is not shared: rate limit
+buckets and the contact dedup window, so with N workers a client may get
+up to N times RATE_LIMIT_BURST before being throttled.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8001")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Importing the app in the master would share one Mongo client across forks
+preload_app = False
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("KEEPALIVE", 5))
+# Proxies whose X-Forwarded-For sets the client address seen by rate limiting
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# Inherited by the workers, which read it when they import server.py
+if workers > 1:
+    os.environ.setdefault("INVALIDATION_BUS", "mongo")
@@ -0,0 +1,198 @@
+"""Index definitions for the portfolio collections.
+
+Run ``python indexes.py`` to create any missing indexes, or
+``python indexes.py --check`` to report missing indexes together with the
+explain-plan stages of the queries the API issues.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from admin_stats import contact_pipeline, status_pipeline
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "blog_posts": [
+        # Newest-first listing and keyset pagination
+        IndexModel([("date", DESCENDING), ("_id", DESCENDING)], name="date_id"),
+        # Category-filtered listing; also finds the newest post per category for facets.py
+        IndexModel([("category", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="category_date_id"),
+        # Weighted full-text search for /api/blog/search
+        IndexModel(
+            [("title", TEXT), ("tags", TEXT), ("excerpt", TEXT), ("content", TEXT)],
+            weights={"title": 10, "tags": 5, "excerpt": 3, "content": 1},
+            name="blog_text",
+        ),
+        # Newest post per tag when facets.py recomputes a tag's latest date
+        IndexModel([("tags", ASCENDING), ("date", DESCENDING)], name="tags_date"),
+    ],
+    "blog_facets": [
+        IndexModel([("kind", ASCENDING), ("count", DESCENDING)], name="kind_count"),
+    ],
+    "contact_submissions": [
+        IndexModel([("type", ASCENDING), ("timestamp", DESCENDING)], name="type_timestamp"),
+        # Covers the /api/admin/stats window aggregation; its timestamp prefix
+        # also serves newest-first reads, so no single-field index is needed
+        IndexModel([("timestamp", DESCENDING), ("type", ASCENDING)], name="timestamp_type"),
+    ],
+    "status_checks": [
+        # Kept alongside timestamp_client_name: it carries the optional TTL
+        IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+        IndexModel([("client_name", ASCENDING), ("timestamp", DESCENDING)], name="client_name_timestamp"),
+        # Covers the /api/admin/stats window aggregation
+        IndexModel([("timestamp", DESCENDING), ("client_name", ASCENDING)], name="timestamp_client_name"),
+    ],
+}
+
+# Indexes an earlier INDEXES created that are now redundant; ensure_indexes drops them
+RETIRED_INDEXES = {
+    "contact_submissions": ["timestamp"],
+}
+
+# The status_checks index that carries the optional TTL
+STATUS_TTL_INDEX = "timestamp"
+
+# Representative commands the API issues, explained by --check
+QUERY_SHAPES = [
+    ("blog_posts", "listing", {"find": "blog_posts", "filter": {}, "sort": {"date": -1, "_id": -1}, "limit": 51}),
+    ("blog_posts", "listing by category", {"find": "blog_posts", "filter": {"category": "Research"}, "sort": {"date": -1, "_id": -1}, "limit": 51}),
+    ("blog_facets", "facets", {"find": "blog_facets", "filter": {}, "sort": {"kind": 1, "count": -1}}),
+    ("blog_posts", "search", {"find": "blog_posts", "filter": {"$text": {"$search": "research"}}, "limit": 20}),
+    ("contact_submissions", "latest contacts", {"find": "contact_submissions", "filter": {}, "sort": {"timestamp": -1}, "limit": 100}),
+    ("status_checks", "latest status checks", {"find": "status_checks", "filter": {}, "sort": {"timestamp": -1}, "limit": 100}),
+    ("contact_submissions", "admin stats", {"aggregate": "contact_submissions", "pipeline": contact_pipeline(datetime(2024, 1, 1), datetime(2024, 2, 1)), "cursor": {}}),
+    ("status_checks", "admin stats", {"aggregate": "status_checks", "pipeline": status_pipeline(datetime(2024, 1, 1), datetime(2024, 2, 1)), "cursor": {}}),
+]
+
+
+async def ensure_indexes(db, status_ttl: Optional[int] = None) -> dict:
+    """Create every index in INDEXES and drop those in RETIRED_INDEXES.
+
+    Existing identical indexes are left alone.
+
+    With ``status_ttl`` the status_checks timestamp index also expires
+    documents that many seconds old, keeping that collection bounded.
+    """
+    created = {}
+    for collection, models in INDEXES.items():
+        existing = await db[collection].index_information()
+        if collection == "status_checks":
+            models = status_models(models, existing, status_ttl)
+        created[collection] = await db[collection].create_indexes(models)
+        for name in RETIRED_INDEXES.get(collection, []):
+            if name in existing:
+                await db[collection].drop_index(name)
+        if collection == "status_checks" and status_ttl and STATUS_TTL_INDEX in existing:
+            if existing[STATUS_TTL_INDEX].get("expireAfterSeconds") != status_ttl:
+                await set_status_ttl(db, status_ttl)
+    return created
+
+
+def status_models(models: List[IndexModel], existing: dict, status_ttl: Optional[int]) -> List[IndexModel]:
+    """The status_checks models, with the TTL index's options kept out of create_indexes.
+
+    Once collMod has given the timestamp index an expireAfterSeconds, sending
+    it again without that option fails with IndexOptionsConflict, so an
+    existing timestamp index is only ever changed through set_status_ttl.
+    """
+    others = [model for model in models if model.document["name"] != STATUS_TTL_INDEX]
+    if STATUS_TTL_INDEX in existing:
+        return others
+    if not status_ttl:
+        return models
+    (ttl_model,) = [model for model in models if model.document["name"] == STATUS_TTL_INDEX]
+    keys = list(ttl_model.document["key"].items())
+    return [IndexModel(keys, name=STATUS_TTL_INDEX, expireAfterSeconds=status_ttl)] + others
+
+
+async def set_status_ttl(db, seconds: int) -> None:
+    # collMod adds or changes expireAfterSeconds in place without a rebuild
+    await db.command(
+        "collMod", "status_checks",
+        index={"name": STATUS_TTL_INDEX, "expireAfterSeconds": seconds},
+    )
+
+
+async def missing_indexes(db) -> dict:
+    missing = {}
+    for collection, models in INDEXES.items():
+        existing = await db[collection].index_information()
+        names = [model.document["name"] for model in models if model.document["name"] not in existing]
+        if names:
+            missing[collection] = names
+    return missing
+
+
+def plan_stages(plan: dict) -> list:
+    """Flatten a winning plan into its stage names, outermost first"""
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+async def explain_queries(db) -> list:
+    report = []
+    for collection, label, command in QUERY_SHAPES:
+        explained = await db.command("explain", command, verbosity="queryPlanner")
+        # Aggregations on older servers report the plan of their $cursor stage
+        planner = explained.get("queryPlanner") or explained["stages"][0]["$cursor"]["queryPlanner"]
+        winning_plan = planner["winningPlan"]
+        # Newer servers wrap the classic plan in a queryPlan document
+        winning_plan = winning_plan.get("queryPlan", winning_plan)
+        report.append({"collection": collection, "query": label, "stages": plan_stages(winning_plan)})
+    return report
+
+
+async def check(db) -> bool:
+    missing = await missing_indexes(db)
+    for collection, names in missing.items():
+        print(f"MISSING {collection}: {', '.join(names)}")
+    if not missing:
+        print("All indexes present")
+    for entry in await explain_queries(db):
+        scan = "COLLSCAN" in entry["stages"]
+        print(f"{'SCAN ' if scan else 'OK   '} {entry['collection']} {entry['query']}: {' <- '.join(entry['stages'])}")
+    return not missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="report missing indexes and query plans without creating anything")
+    args = parser.parse_args()
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    status_ttl = os.environ.get('STATUS_CHECK_TTL_SECONDS')
+
+    async def run():
+        if args.check:
+            return await check(db)
+        created = await ensure_indexes(db, status_ttl=int(status_ttl) if status_ttl else None)
+        for collection, names in created.items():
+            print(f"{collection}: {', '.join(names)}")
+        return True
+
+    try:
+        ok = asyncio.run(run())
+    finally:
+        client.close()
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Read-cache invalidation shared between worker processes.
+
+Each worker keeps its own read cache. When one of them writes a post it
+publishes the cache tags it evicted to a small capped collection, and
+every worker tails that collection with a tailable cursor, evicting the
+same tags from its own cache. A tailable cursor on a capped collection
+works on a standalone mongod, unlike change streams which need a replica
+set. If a worker loses its place in the stream it clears its whole cache
+rather than risk serving stale entries.
+"""
+import asyncio
+import logging
+import uuid
+from typing import Callable, List, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+    """Publish and receive cache invalidations through a capped collection.
+
+    ``on_message(tags)`` runs for every invalidation published by another
+    worker; an empty ``tags`` list means "clear everything".
+    """
+
+    def __init__(self, on_message: Callable[[List[str]], None], size_bytes: int = 1 << 20,
+                 retry_seconds: float = 1.0):
+        self.on_message = on_message
+        self.size_bytes = size_bytes
+        self.retry_seconds = retry_seconds
+        self.worker_id = uuid.uuid4().hex
+        self.collection = None
+        self.published = 0
+        self.received = 0
+        self.resyncs = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, collection) -> None:
+        self.collection = collection
+        self._task = asyncio.create_task(self._tail())
+
+    async def _prepare(self) -> None:
+        try:
+            await self.collection.database.create_collection(
+                self.collection.name, capped=True, size=self.size_bytes
+            )
+        except CollectionInvalid:
+            pass  # created by another worker
+        # A tailable cursor over an empty capped collection dies at once; one
+        # no-op message gives every worker something to wait after
+        if await self.collection.find_one({}, {"_id": 1}) is None:
+            await self.collection.insert_one({"origin": self.worker_id, "tags": [], "noop": True})
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, tags: List[str]) -> None:
+        """Tell the other workers to evict ``tags``, or everything when empty"""
+        if self.collection is None:
+            return
+        try:
+            await self.collection.insert_one({"origin": self.worker_id, "tags": list(tags)})
+            self.published += 1
+        except PyMongoError as e:
+            # The write itself succeeded; other workers catch up when their entries expire
+            logger.warning("Could not publish cache invalidation: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": self._task is not None and not self._task.done(),
+            "published": self.published,
+            "received": self.received,
+            "resyncs": self.resyncs,
+        }
+
+    async def _tail(self) -> None:
+        prepared = False
+        last_id = None
+        cursor = None
+        while True:
+            try:
+                if not prepared:
+                    await self._prepare()
+                    prepared = True
+                if cursor is None or not getattr(cursor, "alive", False):
+                    if cursor is not None:
+                        self._resync()
+                    query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+                    cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                # Ends when no message arrived within the await timeout; the
+                # cursor stays alive and the next pass keeps waiting on it
+                async for message in cursor:
+                    last_id = message["_id"]
+                    self._receive(message)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.warning("Cache invalidation stream interrupted: %s", e)
+                if cursor is not None or last_id is not None:
+                    self._resync()
+                cursor = None
+            if cursor is None or not getattr(cursor, "alive", False):
+                await asyncio.sleep(self.retry_seconds)
+
+    def _receive(self, message: dict) -> None:
+        # This worker already applied its own invalidations when it published them
+        if message["origin"] == self.worker_id or message.get("noop"):
+            return
+        self.received += 1
+        self.on_message(message["tags"])
+
+    def _resync(self) -> None:
+        # The cursor died (capped collection rolled over, failover or a
+        # dropped connection), so messages may have been missed
+        self.resyncs += 1
+        self.on_message([])
@@ -0,0 +1,248 @@
+"""Live post events for Server-Sent Events clients.
+
+Each worker holds one subscription to post changes and fans it out to
+all of its connected clients:
+
+- ``changestream``: a change stream on blog_posts (needs a replica set);
+  it also sees writes made outside the API.
+- ``tail``: a tailable cursor on the capped blog_events collection, which
+  the write routes append to through ``record``; works on any mongod.
+
+Events are small deltas without ``content``. The last ``history`` events
+are kept so a reconnecting client can resume from its Last-Event-ID; if
+that id is no longer known it gets a ``reset`` event and should refetch.
+A client that falls ``client_queue`` events behind is dropped and left
+to reconnect.
+"""
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Iterable, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+
+from fastjson import dumps
+
+logger = logging.getLogger(__name__)
+
+CHANGE_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {"$project": {"fullDocument.content": 0, "updateDescription.updatedFields.content": 0}},
+]
+
+# Sentinels placed on a client queue
+RESET = object()
+DROPPED = object()
+
+
+def event(op: str, post_id: str, **data) -> dict:
+    """A delta event: ``create`` carries ``post``, ``update`` carries changed ``fields``"""
+    return dict(data, op=op, id=post_id)
+
+
+def sse_frame(event: str, data, event_id: Optional[str] = None) -> bytes:
+    frame = b"id: " + event_id.encode() + b"\n" if event_id else b""
+    return frame + b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class LiveFeed:
+    def __init__(self, fields: Iterable[str], source: str = "tail", history: int = 1000,
+                 client_queue: int = 100, max_clients: int = 1000, retry_seconds: float = 2.0,
+                 events_size_bytes: int = 4 << 20):
+        self.fields = frozenset(fields)
+        self.source = source
+        self.client_queue = client_queue
+        self.max_clients = max_clients
+        self.retry_seconds = retry_seconds
+        self.events_size_bytes = events_size_bytes
+        self.posts = None
+        self.events = None
+        self._prepared = False
+        self._history = deque(maxlen=history)
+        self._clients = set()
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+        self.resets = 0
+
+    def configure(self, posts_collection, events_collection) -> None:
+        self.posts = posts_collection
+        self.events = events_collection
+        self._prepared = False
+
+    async def prepare(self) -> None:
+        """Make blog_events a capped collection before anything is written to it.
+
+        An insert into a missing collection would create it uncapped, and
+        a tailable cursor on that never works. A collection left uncapped
+        by an older version is converted in place.
+        """
+        if self.source != "tail" or self.events is None or self._prepared:
+            return
+        try:
+            await self.events.database.create_collection(
+                self.events.name, capped=True, size=self.events_size_bytes
+            )
+        except CollectionInvalid:
+            # Created by another worker, or earlier without the cap
+            if not (await self.events.options()).get("capped"):
+                logger.warning("Converting %s to a capped collection", self.events.name)
+                await self.events.database.command(
+                    "convertToCapped", self.events.name, size=self.events_size_bytes
+                )
+        # A tailable cursor over an empty capped collection dies at once
+        if await self.events.find_one({}, {"_id": 1}) is None:
+            await self.events.insert_one({"op": "noop", "at": datetime.utcnow()})
+        self._prepared = True
+
+    async def record(self, *events: dict) -> None:
+        """Append ``event(...)`` dicts for the ``tail`` source; change streams see writes by themselves"""
+        if self.source != "tail" or self.events is None or not events:
+            return
+        now = datetime.utcnow()
+        try:
+            await self.prepare()
+            await self.events.insert_many([dict(event, at=now) for event in events])
+        except PyMongoError as e:
+            logger.warning("Could not record live events: %s", e)
+
+    def summary(self, doc: dict) -> dict:
+        return {key: value for key, value in doc.items() if key in self.fields}
+
+    # Clients
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[asyncio.Queue]:
+        """A queue of SSE frames for one client, or None when the feed is full"""
+        if len(self._clients) >= self.max_clients:
+            return None
+        backlog = []
+        if last_event_id:
+            ids = [event_id for event_id, _ in self._history]
+            if last_event_id in ids:
+                backlog = [frame for _, frame in list(self._history)[ids.index(last_event_id) + 1:]]
+            else:
+                backlog = [RESET]
+        # One slot beyond the limit stays free for the DROPPED sentinel
+        queue = asyncio.Queue(maxsize=max(self.client_queue, len(backlog)) + 1)
+        for item in backlog:
+            queue.put_nowait(item)
+        self._clients.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._clients.discard(queue)
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "running": self._task is not None and not self._task.done(),
+            "clients": len(self._clients),
+            "published": self.published,
+            "dropped_clients": self.dropped,
+            "resets": self.resets,
+            "history": len(self._history),
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _publish(self, event_id: str, payload: dict) -> None:
+        frame = sse_frame("post", payload, event_id)
+        self._history.append((event_id, frame))
+        self.published += 1
+        for queue in list(self._clients):
+            if queue.qsize() >= queue.maxsize - 1:
+                self._drop(queue)
+            else:
+                queue.put_nowait(frame)
+
+    def _drop(self, queue: asyncio.Queue) -> None:
+        self._clients.discard(queue)
+        self.dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(DROPPED)
+
+    def _reset_all(self) -> None:
+        # Events may have been missed; clients refetch instead of trusting deltas
+        self.resets += 1
+        self._history.clear()
+        for queue in list(self._clients):
+            if queue.qsize() >= queue.maxsize - 1:
+                self._drop(queue)
+            else:
+                queue.put_nowait(RESET)
+
+    # Sources
+
+    async def _run(self) -> None:
+        follow = self._watch if self.source == "changestream" else self._tail
+        while True:
+            try:
+                await follow()
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.warning("Live feed (%s) interrupted: %s", self.source, e)
+            self._reset_all()
+            await asyncio.sleep(self.retry_seconds)
+
+    async def _watch(self) -> None:
+        resume_token = None
+        while True:
+            try:
+                async with self.posts.watch(CHANGE_PIPELINE, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        payload = self._from_change(change)
+                        if payload is not None:
+                            self._publish(resume_token["_data"], payload)
+                # The stream was invalidated (collection dropped or renamed)
+                resume_token = None
+                self._reset_all()
+            except OperationFailure as e:
+                if resume_token is None:
+                    raise
+                # Resuming failed (e.g. the oplog moved past the token): start over
+                logger.warning("Live feed could not resume its change stream: %s", e)
+                resume_token = None
+                self._reset_all()
+
+    def _from_change(self, change: dict) -> Optional[dict]:
+        op = change["operationType"]
+        post_id = str(change["documentKey"]["_id"])
+        if op == "insert":
+            return {"op": "create", "id": post_id, "post": dict(self.summary(change["fullDocument"]), id=post_id)}
+        if op == "delete":
+            return {"op": "delete", "id": post_id}
+        if op == "replace":
+            fields = self.summary(change["fullDocument"])
+        else:
+            fields = self.summary(change["updateDescription"]["updatedFields"])
+        return {"op": "update", "id": post_id, "fields": fields} if fields else None
+
+    async def _tail(self) -> None:
+        await self.prepare()
+        # A tailable cursor whose query matches nothing dies at once, so older
+        # events are skipped here rather than filtered in the query
+        since = datetime.utcnow()
+        cursor = self.events.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+        while True:
+            async for event in cursor:
+                if event["op"] == "noop" or event["at"] < since:
+                    continue
+                event_id = str(event.pop("_id"))
+                del event["at"]
+                self._publish(event_id, event)
+            if not getattr(cursor, "alive", False):
+                return
@@ -0,0 +1,328 @@
+"""In-process metrics rendered in the Prometheus text exposition format."""
+import bisect
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative histogram per label set; safe to observe from driver threads"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts, then the overall count and sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+class CallbackMetric:
+    """Single-valued metric read from ``callback`` at scrape time"""
+
+    def __init__(self, name: str, documentation: str, metric_type: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.callback = callback
+
+    def render(self) -> list:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {self.callback()}",
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body.",
+    ("method", "route", "status"),
+))
+handler_duration = registry.register(Histogram(
+    "http_handler_duration_seconds", "Time spent inside the route function.", ("method", "route"),
+))
+serialization_duration = registry.register(Histogram(
+    "http_serialization_duration_seconds",
+    "Time from the route function returning to the response starting (validation and encoding).",
+    ("method", "route"),
+))
+requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled.",
+))
+mongo_command_duration = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round-trip time reported by the driver.",
+    ("command", "outcome"),
+))
+
+pool_wait_duration = registry.register(Histogram(
+    "mongodb_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool.",
+))
+
+# Per-request phase timings, filled in by TimedRoute and read by MetricsMiddleware
+_request_timings: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_timings", default=None)
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records when its endpoint starts and returns"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed(endpoint), **kwargs)
+
+
+def _timed(endpoint: Callable) -> Callable:
+    def mark(key):
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[key] = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            mark("handler_start")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark("handler_end")
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            mark("handler_start")
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                mark("handler_end")
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by route template.
+
+    Requests slower than ``slow_request_seconds`` are logged with their
+    handler and serialization phases.
+    """
+
+    def __init__(self, app, slow_request_seconds: Optional[float] = None):
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {"start": time.perf_counter()}
+        token = _request_timings.set(timings)
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                timings["response_start"] = time.perf_counter()
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            _request_timings.reset(token)
+            self._record(scope, status, timings)
+
+    def _record(self, scope, status: str, timings: dict) -> None:
+        total = time.perf_counter() - timings["start"]
+        route = scope.get("route")
+        # Unmatched paths share one label so scanners cannot blow up cardinality
+        route_label = getattr(route, "path", "unmatched")
+        request_duration.observe(total, scope["method"], route_label, status)
+
+        handler = serialize = None
+        if "handler_end" in timings:
+            handler = timings["handler_end"] - timings["handler_start"]
+            handler_duration.observe(handler, scope["method"], route_label)
+            if "response_start" in timings:
+                serialize = max(0.0, timings["response_start"] - timings["handler_end"])
+                serialization_duration.observe(serialize, scope["method"], route_label)
+
+        if self.slow_request_seconds is not None and total >= self.slow_request_seconds:
+            logger.warning(
+                "Slow request %s %s -> %s in %.1f ms (handler %s, serialization %s)",
+                scope["method"], route_label, status, total * 1000,
+                f"{handler * 1000:.1f} ms" if handler is not None else "n/a",
+                f"{serialize * 1000:.1f} ms" if serialize is not None else "n/a",
+            )
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters and checkout wait times for /api/health.
+
+    pymongo checks connections out on the thread running the operation,
+    so the start of a checkout is remembered per thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.max_wait_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open_connections": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        pool_wait_duration.observe(waited)
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener feeding mongodb_command_duration_seconds"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, "succeeded")
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, "failed")
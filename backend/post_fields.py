@@ -0,0 +1,160 @@
+"""Fields derived from a post's content, computed once when it is written.
+
+Word count, read time, table of contents, an excerpt for posts saved
+without one, and a hash of the content so updates can tell whether any
+of it needs recomputing. Run ``python post_fields.py --backfill`` once
+to fill them in on posts written before they existed.
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+WORDS_PER_MINUTE = 200
+EXCERPT_CHARS = 200
+
+_WORD_RE = re.compile(r"\w+(?:['’]\w+)*", re.UNICODE)
+# Markdown-style "## Heading" lines
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_SLUG_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def read_time(word_count: int) -> str:
+    return f"{max(1, math.ceil(word_count / WORDS_PER_MINUTE))} min read"
+
+
+def table_of_contents(content: str) -> List[dict]:
+    """Headings in order, each with a unique anchor slug"""
+    toc, seen = [], {}
+    for line in content.splitlines():
+        match = _HEADING_RE.match(line.strip())
+        if not match:
+            continue
+        title = match.group(2)
+        slug = _SLUG_RE.sub("-", title.lower()).strip("-") or "section"
+        seen[slug] = seen.get(slug, 0) + 1
+        anchor = slug if seen[slug] == 1 else f"{slug}-{seen[slug]}"
+        toc.append({"level": len(match.group(1)), "title": title, "anchor": anchor})
+    return toc
+
+
+def auto_excerpt(content: str, limit: int = EXCERPT_CHARS) -> str:
+    """The first non-heading paragraph, cut at a word boundary"""
+    for line in content.splitlines():
+        text = " ".join(line.split())
+        if not text or _HEADING_RE.match(text):
+            continue
+        if len(text) <= limit:
+            return text
+        cut = text.rfind(" ", 0, limit)
+        return text[:cut if cut > 0 else limit].rstrip(" ,;:.") + "…"
+    return ""
+
+
+def derive(content: str, excerpt: Optional[str] = None) -> dict:
+    """Derived fields for ``content``; the excerpt is generated when ``excerpt`` is empty"""
+    word_count = len(_WORD_RE.findall(content))
+    fields = {
+        "wordCount": word_count,
+        "readTime": read_time(word_count),
+        "toc": table_of_contents(content),
+        "contentHash": content_hash(content),
+        "excerptAuto": not excerpt,
+    }
+    if not excerpt:
+        fields["excerpt"] = auto_excerpt(content)
+    return fields
+
+
+def update_fields(update: dict, current: dict) -> dict:
+    """Rewrite a post update so the derived fields follow it.
+
+    ``current`` holds the stored contentHash, excerpt and excerptAuto.
+    Content or an excerpt identical to what is stored is dropped, and
+    fields are only derived again when the content hash changes. A
+    generated excerpt follows the content until an author supplies one;
+    an empty excerpt switches back to the generated one.
+    """
+    update = dict(update)
+    if "excerpt" in update and update["excerpt"] == current.get("excerpt"):
+        del update["excerpt"]
+    content = update.get("content")
+    if content is not None and content_hash(content) != current.get("contentHash"):
+        if "excerpt" in update:
+            excerpt = update["excerpt"]
+        else:
+            excerpt = None if current.get("excerptAuto") else current.get("excerpt")
+        update.update(derive(content, excerpt))
+        return update
+
+    update.pop("content", None)
+    if update.get("excerpt") == "":
+        if content is None:
+            # Generating an excerpt needs the content, which this update lacks
+            del update["excerpt"]
+        else:
+            update.update(excerpt=auto_excerpt(content), excerptAuto=True)
+    elif "excerpt" in update:
+        update["excerptAuto"] = False
+    return update
+
+
+async def backfill(db, batch_size: int = 500) -> int:
+    """Derive fields for posts that predate them; returns the number updated.
+
+    Each backfilled post gets a new revision and updatedAt, like any other
+    write, so its ETag changes and snapshot.py rewrites its file.
+    """
+    updated = 0
+    requests = []
+    now = datetime.utcnow()
+    # Mongo keeps milliseconds; match what a read would return
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    async for post in db.blog_posts.find({"contentHash": {"$exists": False}}, {"content": 1, "excerpt": 1}):
+        fields = derive(post.get("content", ""), post.get("excerpt"))
+        requests.append(UpdateOne(
+            {"_id": post["_id"]},
+            {"$set": dict(fields, updatedAt=now), "$inc": {"revision": 1}},
+        ))
+        if len(requests) >= batch_size:
+            updated += (await db.blog_posts.bulk_write(requests, ordered=False)).modified_count
+            requests = []
+    if requests:
+        updated += (await db.blog_posts.bulk_write(requests, ordered=False)).modified_count
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backfill", action="store_true", help="derive fields for posts that lack them")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        count = asyncio.run(backfill(db))
+    finally:
+        client.close()
+    print(f"Backfilled {count} posts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import html
+import re
+from typing import List
+
+# Runs of word characters, roughly how the text index tokenizes a query
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q: str) -> List[str]:
+    """Terms to highlight for a $text query, ignoring negated terms"""
+    terms = []
+    for token in q.split():
+        if token.startswith("-"):
+            continue
+        terms += [term.lower() for term in _TERM_RE.findall(token)]
+    return list(dict.fromkeys(terms))
+
+
+def highlight(text: str, terms: List[str], width: int = 160) -> str:
+    """HTML-escaped window of ``text`` around the first term match, with
+    every match wrapped in <mark>. Terms match as word prefixes so stemmed
+    hits such as "learning" for "learn" are highlighted too."""
+    if not text:
+        return ""
+    if not terms:
+        return html.escape(text[:width])
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    match = pattern.search(text)
+    start = 0
+    if match:
+        start = max(0, match.start() - width // 4)
+        # Do not cut a word in half at the start of the window
+        if start:
+            space = text.find(" ", start)
+            start = space + 1 if 0 <= space < match.start() else start
+    window = text[start:start + width]
+
+    parts = []
+    last = 0
+    for hit in pattern.finditer(window):
+        parts.append(html.escape(window[last:hit.start()]))
+        parts.append(f"<mark>{html.escape(hit.group(0))}</mark>")
+        last = hit.end()
+    parts.append(html.escape(window[last:]))
+    snippet = "".join(parts)
+    if start:
+        snippet = "…" + snippet
+    if start + width < len(text):
+        snippet += "…"
+    return snippet
@@ -1,31 +1,168 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, Body, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional, Union
 import uuid
-from datetime import datetime
+import asyncio
+import json
+import base64
+import hashlib
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReadPreference, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from cache import TTLCache
+from invalidation import InvalidationBus
+from live import DROPPED, RESET, LiveFeed, event, sse_frame
+from indexes import ensure_indexes
+import facets
+from admin_stats import contact_stats, status_stats
+from post_fields import derive, update_fields
+from search import highlight, search_terms
+from contact_queue import BatchWriter
+from ratelimit import RateLimitMiddleware, TokenBucketLimiter
+from fastjson import FastJSONResponse, dumps as fast_dumps, shaper
+from compression import CompressionMiddleware
+from cache_control import CacheControlMiddleware, cache_policy
+from metrics import CallbackMetric, MetricsMiddleware, MongoCommandTimer, PoolStats, TimedRoute, registry
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection pool settings; unset variables keep the driver defaults
+MONGO_OPTION_ENV = {
+    'maxPoolSize': ('MONGO_MAX_POOL_SIZE', int),
+    'minPoolSize': ('MONGO_MIN_POOL_SIZE', int),
+    'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', int),
+    'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+    'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', int),
+    # e.g. "zstd,snappy"; codecs whose package is missing are skipped with a warning
+    'compressors': ('MONGO_COMPRESSORS', str),
+}
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST,
+}
 
-# Create the main app without a prefix
-app = FastAPI()
+def mongo_client_options() -> dict:
+    options = {}
+    for option, (env_name, cast) in MONGO_OPTION_ENV.items():
+        if os.environ.get(env_name):
+            options[option] = cast(os.environ[env_name])
+    return options
+
+mongo_options = mongo_client_options()
+pool_stats = PoolStats()
+# Created by connect_mongo() in the app lifespan, not at import time, so
+# importing this module stays cheap and needs no database settings
+client = None
+db = None
+read_db = None
+
+def connect_mongo():
+    global client, db, read_db
+    # Imported here: motor is only needed once a worker actually starts
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(
+        os.environ['MONGO_URL'], event_listeners=[MongoCommandTimer(), pool_stats], **mongo_options
+    )
+    db = client[os.environ['DB_NAME']]
+    # Search and admin stats read through read_db, so MONGO_READ_PREFERENCE=secondaryPreferred
+    # moves them to secondaries. Everything else stays on the primary: a lagging
+    # secondary read after a write's invalidation would be cached (and its
+    # listing ETag validated) as current until the next write.
+    read_db = db.with_options(
+        read_preference=READ_PREFERENCES[os.environ.get('MONGO_READ_PREFERENCE', 'primary')]
+    )
+
+def close_mongo():
+    global client, db, read_db
+    if client is not None:
+        client.close()
+    client = db = read_db = None
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# Opt-in: encode listings straight from documents instead of validating each
+# item against its response model; the wire format is unchanged
+FAST_JSON_RESPONSES = os.environ.get('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+
+# Page size bounds for the blog listing
+DEFAULT_PAGE_SIZE = int(os.environ.get('BLOG_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.environ.get('BLOG_MAX_PAGE_SIZE', 200))
 
+# Status check listing bound and optional retention
+STATUS_MAX_LIMIT = int(os.environ.get('STATUS_MAX_LIMIT', 5000))
+STATUS_CHECK_TTL_SECONDS = os.environ.get('STATUS_CHECK_TTL_SECONDS')
+
+# Contact submissions are queued and written in batches
+contact_writer = BatchWriter(
+    max_queue=int(os.environ.get('CONTACT_QUEUE_SIZE', 1000)),
+    batch_size=int(os.environ.get('CONTACT_BATCH_SIZE', 100)),
+    flush_interval=float(os.environ.get('CONTACT_FLUSH_SECONDS', 0.5)),
+)
+
+# Write limits for public POST routes, per route and client IP and per status client_name
+write_limiter = TokenBucketLimiter(
+    rate=float(os.environ.get('RATE_LIMIT_PER_MINUTE', 10)) / 60,
+    burst=int(os.environ.get('RATE_LIMIT_BURST', 5)),
+    max_keys=int(os.environ.get('RATE_LIMIT_MAX_KEYS', 10000)),
+)
+RATE_LIMITED_ROUTES = [("POST", "/api/contact"), ("POST", "/api/status")]
+
+# Identical contact payloads within the window are answered with the first submission
+contact_dedup = TTLCache(
+    maxsize=int(os.environ.get('CONTACT_DEDUP_MAXSIZE', 10000)),
+    ttl=float(os.environ.get('CONTACT_DEDUP_SECONDS', 600)),
+)
+
+# Component counters exported at /api/metrics
+for name, documentation, metric_type, callback in [
+    ("blog_cache_hits_total", "Read cache hits.", "counter", lambda: read_cache.hits),
+    ("blog_cache_misses_total", "Read cache misses.", "counter", lambda: read_cache.misses),
+    ("blog_cache_evictions_total", "Read cache LRU evictions.", "counter", lambda: read_cache.evictions),
+    ("mongodb_pool_checked_out", "Connections currently checked out of the pool.", "gauge", lambda: pool_stats.checked_out),
+    ("mongodb_pool_waiting", "Operations waiting for a pooled connection.", "gauge", lambda: pool_stats.waiting),
+    ("contact_queue_depth", "Contact submissions waiting to be written.", "gauge", lambda: contact_writer.queue.qsize()),
+    ("contact_queue_rejected_total", "Contact submissions shed because the queue was full.", "counter", lambda: contact_writer.rejected),
+    ("rate_limit_rejected_total", "Writes rejected by the rate limiter.", "counter", lambda: write_limiter.rejected),
+    ("contact_dedup_hits_total", "Duplicate contact submissions answered from the dedup window.", "counter", lambda: contact_dedup.hits),
+]:
+    registry.register(CallbackMetric(name, documentation, metric_type, callback))
+
+# Unconditional updates that keep losing the race to other writers give up after this
+UPDATE_ATTEMPTS = int(os.environ.get('UPDATE_ATTEMPTS', 3))
+
+# Bulk import/export sizing
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+# Read cache for blog routes, invalidated by the write routes
+read_cache = TTLCache(
+    maxsize=int(os.environ.get('CACHE_MAXSIZE', 1024)),
+    ttl=float(os.environ.get('CACHE_TTL_SECONDS', 60)),
+)
+
+# Aggregated admin stats: default and largest window, and how long results are reused
+ADMIN_STATS_DAYS = int(os.environ.get('ADMIN_STATS_DAYS', 30))
+ADMIN_STATS_MAX_DAYS = int(os.environ.get('ADMIN_STATS_MAX_DAYS', 366))
+ADMIN_STATS_TTL_SECONDS = int(os.environ.get('ADMIN_STATS_TTL_SECONDS', 30))
+stats_cache = TTLCache(maxsize=256, ttl=ADMIN_STATS_TTL_SECONDS)
 
 # Define Models
 class StatusCheck(BaseModel):
@@ -36,7 +173,14 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+STATUS_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+
 # Blog Models
+class TocEntry(BaseModel):
+    level: int
+    title: str
+    anchor: str
+
 class BlogPost(BaseModel):
     id: Optional[str] = None
     title: str
@@ -46,24 +190,84 @@ class BlogPost(BaseModel):
     content: str
     tags: List[str] = Field(default_factory=list)
     readTime: str = "5 min read"
+    wordCount: int = 0
     author: str = "[Your Name]"
+    revision: int = 0
+    updatedAt: Optional[datetime] = None
+    toc: List[TocEntry] = Field(default_factory=list)
+    contentHash: Optional[str] = None
 
-class BlogPostCreate(BaseModel):
+class BlogPostSummary(BaseModel):
+    """Listing view of a post without the ``content`` body"""
+    id: Optional[str] = None
     title: str
     category: str
+    date: datetime = Field(default_factory=datetime.utcnow)
     excerpt: str
+    tags: List[str] = Field(default_factory=list)
+    readTime: str = "5 min read"
+    wordCount: int = 0
+    author: str = "[Your Name]"
+
+shape_blog_post = shaper(BlogPost)
+shape_blog_post_summary = shaper(BlogPostSummary)
+
+# Mongo projection matching BlogPostSummary
+SUMMARY_PROJECTION = {field: 1 for field in BlogPostSummary.model_fields if field != "id"}
+# Summary listings also read what their validators are derived from
+LISTING_SUMMARY_PROJECTION = dict(SUMMARY_PROJECTION, revision=1, updatedAt=1)
+
+class BlogSearchResult(BlogPostSummary):
+    score: float
+    snippet: str
+
+class BlogSearchResponse(BaseModel):
+    results: List[BlogSearchResult]
+    next_offset: Optional[int] = None
+
+class BlogPostCreate(BaseModel):
+    """A new post; readTime and the other content-derived fields are computed,
+    and the excerpt is generated from the content when left empty"""
+    title: str
+    category: str
+    excerpt: Optional[str] = None
     content: str
     tags: List[str] = Field(default_factory=list)
-    readTime: Optional[str] = "5 min read"
     author: Optional[str] = "[Your Name]"
 
+class BlogPostImport(BlogPostCreate):
+    """A post being migrated in bulk; keeps its original date when given"""
+    date: Optional[datetime] = None
+
+class BulkImportError(BaseModel):
+    index: int
+    message: str
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    ids: List[str]
+    errors: List[BulkImportError]
+
+class BlogFacet(BaseModel):
+    name: str
+    count: int
+    latest: Optional[datetime] = None
+
+class BlogFacets(BaseModel):
+    categories: List[BlogFacet]
+    tags: List[BlogFacet]
+
 class BlogPostUpdate(BaseModel):
     title: Optional[str] = None
     category: Optional[str] = None
     excerpt: Optional[str] = None
     content: Optional[str] = None
     tags: Optional[List[str]] = None
-    readTime: Optional[str] = None
+    # Tag edits applied to the stored list (or to ``tags`` when both are given)
+    addTags: Optional[List[str]] = None
+    removeTags: Optional[List[str]] = None
+    # Precondition: the revision the editor started from
+    revision: Optional[int] = None
 
 # Contact Form Models
 class ContactSubmission(BaseModel):
@@ -82,6 +286,18 @@ class ContactSubmissionCreate(BaseModel):
     message: str
     type: str = "general"
 
+# BSON stores datetimes at millisecond precision; truncating up front keeps
+# responses built from the written dict identical to later reads
+def utcnow_ms() -> datetime:
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored dates are naive UTC; aware ones would not compare with them"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 # Helper function to convert ObjectId to string
 def blog_post_helper(post) -> dict:
     if post:
@@ -89,121 +305,713 @@ def blog_post_helper(post) -> dict:
         del post["_id"]
     return post
 
+# Keyset pagination helpers: a cursor is the (date, _id) of the last post on a page
+def encode_cursor(post) -> str:
+    payload = json.dumps({"d": post["date"].isoformat(), "id": str(post["_id"])})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["d"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def cursor_query(cursor: str) -> dict:
+    date, oid = decode_cursor(cursor)
+    return {"$or": [
+        {"date": {"$lt": date}},
+        {"date": date, "_id": {"$lt": oid}},
+    ]}
+
+# HTTP validators are derived from stored revisions, so every worker and every
+# restart agrees on them. The in-process counter only tracks when this
+# worker's read cache was last invalidated.
+class BlogVersion:
+    def __init__(self):
+        self.counter = 0
+
+    def bump(self):
+        self.counter += 1
+
+blog_version = BlogVersion()
+
+def post_etag(post: dict) -> str:
+    return f'"{post["id"]}-{post.get("revision", 0)}"'
+
+def post_last_modified(post: dict) -> datetime:
+    return post.get("updatedAt") or post["date"]
+
+EPOCH = datetime(1970, 1, 1)
+
+def listing_validators(params: tuple, posts: List[dict], next_cursor: Optional[str]):
+    """ETag and Last-Modified of a listing page, from the posts on it and their revisions"""
+    page = [(post["id"], post.get("revision", 0)) for post in posts]
+    digest = hashlib.sha1(repr((params, page, next_cursor)).encode()).hexdigest()[:16]
+    return f'"{digest}"', max((post_last_modified(post) for post in posts), default=EPOCH)
+
+def validator_headers(etag: str, last_modified: datetime) -> dict:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+    }
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: proxies that compress responses send our ETags back as W/"..."
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+def not_modified_response(etag: str, last_modified: datetime) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+# Cache tags: one per post, one per listing filter and one for the facet counts
+FACETS_TAG = "facets"
+
+def post_tag(post_id: str) -> str:
+    return f"post:{post_id}"
+
+def listing_tag(category: Optional[str]) -> str:
+    return f"posts:{category or '*'}"
+
+async def blog_changed(*tags: str):
+    """Evict ``tags`` (or every entry when none are given) here and in the other workers"""
+    apply_invalidation(list(tags))
+    await invalidation_bus.publish(tags)
+
+async def post_written(facet_update, tags: List[str], *events: dict):
+    """Side effects of a post write: facet counts, cache invalidation and live events.
+
+    The live events are recorded concurrently. Caches are invalidated only
+    once ``facet_update`` has landed, so no read re-caches the old counts,
+    and also when it fails: the post write itself has already landed.
+    """
+    async def facets_then_caches():
+        try:
+            await facet_update
+        finally:
+            await blog_changed(*tags)
+
+    await asyncio.gather(facets_then_caches(), live_feed.record(*events))
+
+def cache_if_unchanged(version: int, key, value, tags: List[str]):
+    """Cache a read that started at blog_version ``version`` unless a write landed meanwhile"""
+    # The write's invalidation ran while the read was in flight, so the
+    # result may predate it and would otherwise be served until it expires
+    if blog_version.counter == version:
+        read_cache.set(key, value, tags)
+
+def apply_invalidation(tags: List[str]):
+    if tags:
+        read_cache.invalidate(*tags)
+    else:
+        read_cache.clear()
+    blog_version.bump()
+
+# With several workers each has its own read cache; INVALIDATION_BUS=mongo
+# relays every eviction to the others (gunicorn.conf.py turns it on)
+INVALIDATION_BUS = os.environ.get('INVALIDATION_BUS', 'none').lower()
+invalidation_bus = InvalidationBus(apply_invalidation)
+
+# Server-Sent Events for post changes, see live.py
+LIVE_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_HEARTBEAT_SECONDS', 15))
+live_feed = LiveFeed(
+    fields=list(BlogPostSummary.model_fields) + ["revision", "updatedAt"],
+    source=os.environ.get('LIVE_FEED_SOURCE', 'tail'),
+    history=int(os.environ.get('LIVE_HISTORY', 1000)),
+    client_queue=int(os.environ.get('LIVE_CLIENT_QUEUE', 100)),
+    max_clients=int(os.environ.get('LIVE_MAX_CLIENTS', 1000)),
+)
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Academic Portfolio API"}
 
+@api_router.get("/health")
+async def health():
+    """Readiness check: Mongo ping latency plus connection pool statistics"""
+    started = time.perf_counter()
+    try:
+        await db.client.admin.command("ping")
+    except PyMongoError as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "error": str(e)})
+    return {
+        "status": "ok",
+        "mongo": {
+            "ping_ms": round((time.perf_counter() - started) * 1000, 3),
+            "read_preference": read_db.read_preference.mongos_mode,
+            "options": mongo_options,
+        },
+        "pool": pool_stats.snapshot(),
+    }
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
+    allowed, retry_after = write_limiter.hit(f"client:{input.client_name}")
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many status checks for this client",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
     _ = await db.status_checks.insert_one(status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=STATUS_MAX_LIMIT),
+    format: Literal["json", "ndjson"] = "json",
+):
+    """Stream status checks newest first, optionally within [since, until)"""
+    query = {}
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+
+    status_cursor = (
+        db.status_checks.find(query, STATUS_PROJECTION)
+        .sort("timestamp", -1)
+        .limit(limit)
+        .batch_size(min(limit, 500))
+    )
+
+    # Documents already match StatusCheck, so they are encoded straight off the cursor
+    async def json_array():
+        separator = b"["
+        async for status_check in status_cursor:
+            yield separator + fast_dumps(status_check)
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+    async def ndjson_lines():
+        async for status_check in status_cursor:
+            yield fast_dumps(status_check) + b"\n"
+
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    return StreamingResponse(json_array(), media_type="application/json")
 
 # Blog Post Routes
-@api_router.get("/blog/posts", response_model=List[BlogPost])
-async def get_blog_posts(category: Optional[str] = None, limit: Optional[int] = None):
-    """Get all blog posts, optionally filtered by category"""
+@api_router.get("/blog/posts", response_model=Union[List[BlogPost], List[BlogPostSummary]])
+async def get_blog_posts(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    view: Literal["full", "summary"] = "full",
+):
+    """Get a page of blog posts, newest first, optionally filtered by category.
+
+    Pass the ``X-Next-Cursor`` header of one page as ``cursor`` to get the next.
+    ``view=summary`` leaves out the ``content`` body of each post.
+    """
     query = {}
     if category and category != "All":
         query["category"] = category
-    
-    posts_cursor = db.blog_posts.find(query).sort("date", -1)
-    if limit:
-        posts_cursor = posts_cursor.limit(limit)
-    
-    posts = await posts_cursor.to_list(1000)
-    return [blog_post_helper(post) for post in posts]
+    page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    cache_key = ("posts", query.get("category"), page_size, cursor, view)
+    cached = read_cache.get(cache_key)
+    if cached is None:
+        version = blog_version.counter
+        if cursor:
+            query.update(cursor_query(cursor))
+        # Fetch one extra document to learn whether another page exists
+        projection = LISTING_SUMMARY_PROJECTION if view == "summary" else None
+        posts_cursor = db.blog_posts.find(query, projection).sort([("date", -1), ("_id", -1)]).limit(page_size + 1)
+        posts = await posts_cursor.to_list(page_size + 1)
+
+        next_cursor = None
+        if len(posts) > page_size:
+            posts = posts[:page_size]
+            next_cursor = encode_cursor(posts[-1])
+        posts = [blog_post_helper(post) for post in posts]
+        cached = (posts, next_cursor, *listing_validators(cache_key, posts, next_cursor))
+
+        # Tag the page with its filter and every post on it so writes can evict it
+        tags = [listing_tag(query.get("category"))] + [post_tag(post["id"]) for post in posts]
+        cache_if_unchanged(version, cache_key, cached, tags)
+        if view == "full":
+            # Full documents: later single-post reads and edits can start from these
+            for post in posts:
+                cache_if_unchanged(version, ("post", post["id"]), post, [post_tag(post["id"])])
+
+    posts, next_cursor, etag, last_modified = cached
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts_response(posts, view, response)
+
+def posts_response(posts: List[dict], view: str, response: Response):
+    """Return ``posts`` for FastAPI to validate, or pre-encoded on the fast path"""
+    if not FAST_JSON_RESPONSES:
+        return posts
+    shape = shape_blog_post_summary if view == "summary" else shape_blog_post
+    # Returning a Response skips the injected one, so carry its headers over
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return FastJSONResponse([shape(post) for post in posts], headers=headers)
 
 @api_router.get("/blog/posts/{post_id}", response_model=BlogPost)
-async def get_blog_post(post_id: str):
+async def get_blog_post(post_id: str, request: Request, response: Response):
     """Get a specific blog post by ID"""
-    try:
-        post = await db.blog_posts.find_one({"_id": ObjectId(post_id)})
-        if post:
-            return blog_post_helper(post)
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    except Exception as e:
-        raise HTTPException(status_code=404, detail="Blog post not found")
+    post = read_cache.get(("post", post_id))
+    if post is None:
+        version = blog_version.counter
+        try:
+            post = await db.blog_posts.find_one({"_id": ObjectId(post_id)})
+        except InvalidId:
+            post = None
+        if not post:
+            raise HTTPException(status_code=404, detail="Blog post not found")
+        post = blog_post_helper(post)
+        cache_if_unchanged(version, ("post", post_id), post, [post_tag(post_id)])
+
+    etag, last_modified = post_etag(post), post_last_modified(post)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
+    return post
 
 @api_router.post("/blog/posts", response_model=BlogPost)
 async def create_blog_post(post: BlogPostCreate):
     """Create a new blog post"""
     post_dict = post.dict()
-    post_dict["date"] = datetime.utcnow()
+    post_dict.update(derive(post.content, post.excerpt))
+    post_dict["date"] = utcnow_ms()
+    post_dict["updatedAt"] = post_dict["date"]
+    post_dict["revision"] = 1
     
     result = await db.blog_posts.insert_one(post_dict)
-    new_post = await db.blog_posts.find_one({"_id": result.inserted_id})
+    post_dict["_id"] = result.inserted_id
+    post_id = str(result.inserted_id)
+    await post_written(
+        facets.posts_added(db, [post_dict]),
+        [listing_tag(None), listing_tag(post.category), FACETS_TAG],
+        event("create", post_id, post=live_feed.summary(dict(post_dict, id=post_id))),
+    )
+    post_dict = blog_post_helper(post_dict)
     
-    return blog_post_helper(new_post)
+    return post_dict
+
+@api_router.post("/blog/posts/bulk", response_model=BulkImportResult)
+async def bulk_import_blog_posts(items: List[dict] = Body(...)):
+    """Import many posts in one unordered insert_many, reporting failures per item"""
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} posts per request")
+
+    errors = []
+    docs, positions = [], []
+    now = utcnow_ms()
+    for index, item in enumerate(items):
+        try:
+            post = BlogPostImport.model_validate(item)
+        except ValidationError as e:
+            first = e.errors()[0]
+            location = ".".join(str(part) for part in first["loc"])
+            errors.append({"index": index, "message": f"{location}: {first['msg']}"})
+            continue
+        post_dict = post.dict()
+        post_dict.update(derive(post.content, post.excerpt))
+        # "Z"-suffixed dates parse as aware; undated posts get the naive now
+        post_dict["date"] = naive_utc(post_dict["date"]) or now
+        post_dict["updatedAt"] = now
+        post_dict["revision"] = 1
+        docs.append(post_dict)
+        positions.append(index)
+
+    failed = set()
+    if docs:
+        try:
+            await db.blog_posts.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                errors.append({"index": positions[write_error["index"]], "message": write_error["errmsg"]})
+        inserted = [doc for i, doc in enumerate(docs) if i not in failed]
+        # No tags: an import can touch any listing, so every cached entry goes
+        await post_written(facets.posts_added(db, inserted), [], *(
+            event("create", str(doc["_id"]), post=live_feed.summary(dict(doc, id=str(doc["_id"]))))
+            for doc in inserted
+        ))
+
+    ids = [str(doc["_id"]) for i, doc in enumerate(docs) if i not in failed]
+    errors.sort(key=lambda error: error["index"])
+    return {"inserted": len(ids), "ids": ids, "errors": errors}
+
+@api_router.get("/blog/export")
+async def export_blog_posts():
+    """Stream every post as NDJSON, oldest first, without buffering the collection"""
+    async def ndjson_lines():
+        lines = []
+        async for post in db.blog_posts.find().sort("_id", 1).batch_size(EXPORT_BATCH_SIZE):
+            lines.append(fast_dumps(blog_post_helper(post)))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
 
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+def if_match_satisfied(if_match: str, post: dict) -> bool:
+    candidates = [tag.strip() for tag in if_match.split(",")]
+    return "*" in candidates or post_etag({"id": str(post["_id"]), "revision": post.get("revision", 0)}) in candidates
+
+def post_changes(post: BlogPostUpdate, current: dict) -> dict:
+    """Fields of ``post`` that differ from ``current``, with derived fields following content"""
+    update_data = {
+        k: v for k, v in post.dict(exclude={"revision", "addTags", "removeTags"}).items() if v is not None
+    }
+    if post.addTags or post.removeTags:
+        tags = list(update_data.get("tags", current.get("tags", [])))
+        tags += [tag for tag in dict.fromkeys(post.addTags or []) if tag not in tags]
+        update_data["tags"] = [tag for tag in tags if tag not in set(post.removeTags or [])]
+    if "content" in update_data or "excerpt" in update_data:
+        update_data = update_fields(update_data, current)
+    return {k: v for k, v in update_data.items() if current.get(k) != v}
+
+@api_router.patch("/blog/posts/{post_id}", response_model=BlogPost)
 @api_router.put("/blog/posts/{post_id}", response_model=BlogPost)
-async def update_blog_post(post_id: str, post: BlogPostUpdate):
-    """Update a blog post"""
+async def update_blog_post(
+    post_id: str,
+    post: BlogPostUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """Update the given fields of a blog post.
+
+    ``If-Match`` (the post's ETag) or ``revision`` in the body makes the
+    update conditional: it fails with 409 if the post changed since. Fields
+    equal to the stored ones are not written, and an update that changes
+    nothing returns the post without a write.
+    """
     try:
-        update_data = {k: v for k, v in post.dict().items() if v is not None}
-        if update_data:
-            await db.blog_posts.update_one(
-                {"_id": ObjectId(post_id)}, 
-                {"$set": update_data}
-            )
-        
-        updated_post = await db.blog_posts.find_one({"_id": ObjectId(post_id)})
-        if updated_post:
-            return blog_post_helper(updated_post)
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    except Exception as e:
+        oid = ObjectId(post_id)
+    except InvalidId:
         raise HTTPException(status_code=404, detail="Blog post not found")
+    # Changes are computed against the cached copy when there is one, so the
+    # usual edit is a single guarded write; Mongo is only read when that
+    # copy turns out to be behind, to tell a missing post from a conflict
+    current = cached_post(post_id)
+    failed_writes = 0
+    while True:
+        from_cache = current is not None
+        if not from_cache:
+            current = await db.blog_posts.find_one({"_id": oid})
+            if not current:
+                raise HTTPException(status_code=404, detail="Blog post not found")
+        revision = current.get("revision", 0)
+        if (if_match is not None and not if_match_satisfied(if_match, current)) or (
+            post.revision is not None and post.revision != revision
+        ):
+            if from_cache:
+                current = None
+                continue
+            raise revision_conflict(post_id, revision)
+
+        changes = post_changes(post, current)
+        if not changes:
+            if from_cache:
+                # Nothing to write, but a cached copy cannot vouch for the stored post
+                current = None
+                continue
+            updated_post = current
+            break
+        changes["updatedAt"] = utcnow_ms()
+        # Written only over the revision the changes were computed against
+        updated_post = await db.blog_posts.find_one_and_update(
+            {"_id": oid, "revision": revision if "revision" in current else {"$exists": False}},
+            {"$set": changes, "$inc": {"revision": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated_post:
+            tags = [post_tag(post_id), FACETS_TAG]
+            if "category" in changes:
+                tags.append(listing_tag(changes["category"]))
+            await post_written(
+                facets.post_changed(db, current, updated_post),
+                tags,
+                event("update", post_id, fields=live_feed.summary(dict(changes, revision=revision + 1))),
+            )
+            break
+        # Deleted, or another write got in first: a conditional update now
+        # fails its precondition, an unconditional one is recomputed
+        if not from_cache:
+            failed_writes += 1
+            if failed_writes >= UPDATE_ATTEMPTS:
+                raise HTTPException(status_code=409, detail="Blog post is being edited concurrently, try again")
+        current = None
+
+    updated_post = blog_post_helper(updated_post)
+    response.headers.update(validator_headers(post_etag(updated_post), post_last_modified(updated_post)))
+    return updated_post
+
+def cached_post(post_id: str) -> Optional[dict]:
+    """The read cache's copy of a post as a stored document, if it holds one"""
+    post = read_cache.get(("post", post_id))
+    if post is None:
+        return None
+    post = dict(post)
+    post["_id"] = ObjectId(post.pop("id"))
+    return post
+
+def revision_conflict(post_id: str, revision: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Blog post was modified since it was read (current revision {revision})",
+        headers={"ETag": post_etag({"id": post_id, "revision": revision})},
+    )
 
 @api_router.delete("/blog/posts/{post_id}")
 async def delete_blog_post(post_id: str):
     """Delete a blog post"""
     try:
-        result = await db.blog_posts.delete_one({"_id": ObjectId(post_id)})
-        if result.deleted_count:
-            return {"message": "Blog post deleted successfully"}
+        oid = ObjectId(post_id)
+    except InvalidId:
         raise HTTPException(status_code=404, detail="Blog post not found")
-    except Exception as e:
+    deleted = await db.blog_posts.find_one_and_delete(
+        {"_id": oid}, projection={"category": 1, "tags": 1, "date": 1}
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Blog post not found")
+    await post_written(
+        facets.posts_removed(db, [deleted]), [post_tag(post_id), FACETS_TAG], event("delete", post_id)
+    )
+    return {"message": "Blog post deleted successfully"}
+
+@api_router.get("/blog/live")
+async def live_blog_events(last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events for created, updated and deleted posts.
+
+    ``post`` events carry a delta (no ``content``); on ``reset`` the client
+    should refetch, and after ``dropped`` it should reconnect. Browsers send
+    Last-Event-ID on reconnect, which replays the events missed since.
+    """
+    queue = live_feed.subscribe(last_event_id)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many live clients", headers={"Retry-After": "30"})
+
+    async def event_stream():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                if item is DROPPED:
+                    yield sse_frame("dropped", {"reason": "client fell behind"})
+                    return
+                yield sse_frame("reset", {}) if item is RESET else item
+        finally:
+            live_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/blog/live/stats")
+async def get_live_feed_stats():
+    """Connected clients and event counters for this worker's live feed"""
+    return live_feed.stats()
+
+# Server error code for a $text query without a text index
+TEXT_INDEX_NOT_FOUND = 27
+
+@api_router.get("/blog/search", response_model=BlogSearchResponse)
+async def search_blog_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+):
+    """Full-text search over title, tags, excerpt and content, best match first"""
+    query = {"$text": {"$search": q}}
+    if category and category != "All":
+        query["category"] = category
+    projection = dict(SUMMARY_PROJECTION, content=1, score={"$meta": "textScore"})
+
+    posts_cursor = (
+        read_db.blog_posts.find(query, projection)
+        .sort([("score", {"$meta": "textScore"}), ("_id", -1)])
+        .skip(offset)
+        .limit(limit + 1)
+    )
+    try:
+        posts = await posts_cursor.to_list(limit + 1)
+    except OperationFailure as e:
+        if e.code != TEXT_INDEX_NOT_FOUND:
+            raise
+        # ENSURE_INDEXES=false, or a new worker still building blog_text
+        logger.warning("Search unavailable: %s", e)
+        raise HTTPException(status_code=503, detail="Search is temporarily unavailable", headers={"Retry-After": "30"})
+
+    terms = search_terms(q)
+    results = []
+    for post in posts[:limit]:
+        content = post.pop("content", "")
+        # Prefer a snippet from the body; fall back to the excerpt
+        snippet = highlight(content, terms)
+        if "<mark>" not in snippet:
+            snippet = highlight(post.get("excerpt", ""), terms)
+        post["snippet"] = snippet
+        results.append(blog_post_helper(post))
+
+    next_offset = offset + limit if len(posts) > limit else None
+    return {"results": results, "next_offset": next_offset}
+
+# True while seed_blog_facets may still be building blog_facets in the
+# background; its counts are incomplete and must not be cached meanwhile
+facets_seeding = False
+
+async def get_facets() -> dict:
+    if facets_seeding:
+        # A 503 carries no Cache-Control, so shared caches do not keep it
+        raise HTTPException(status_code=503, detail="Facets are being built", headers={"Retry-After": "5"})
+    cached = read_cache.get(("facets",))
+    if cached is None:
+        version = blog_version.counter
+        cached = await facets.list_facets(db)
+        cache_if_unchanged(version, ("facets",), cached, [FACETS_TAG])
+    return cached
 
 @api_router.get("/blog/categories")
 async def get_blog_categories():
     """Get all unique blog categories"""
-    categories = await db.blog_posts.distinct("category")
-    return {"categories": categories}
+    if facets_seeding:
+        return {"categories": sorted(await db.blog_posts.distinct("category"))}
+    return {"categories": sorted(facet["name"] for facet in (await get_facets())["categories"])}
+
+@api_router.get("/blog/facets", response_model=BlogFacets)
+async def get_blog_facets():
+    """Post counts and newest post date per category and per tag, largest first"""
+    return await get_facets()
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit, miss and eviction counters for the read cache"""
+    return read_cache.stats()
 
 # Contact Form Routes
-@api_router.post("/contact", response_model=ContactSubmission)
+@api_router.post("/contact", response_model=ContactSubmission, status_code=202)
 async def submit_contact_form(contact: ContactSubmissionCreate):
-    """Submit contact form"""
+    """Accept a contact form submission; it is written to Mongo in the next batch"""
     contact_dict = contact.dict()
-    contact_dict["timestamp"] = datetime.utcnow()
-    
-    result = await db.contact_submissions.insert_one(contact_dict)
-    new_submission = await db.contact_submissions.find_one({"_id": result.inserted_id})
+    content_hash = hashlib.sha256(json.dumps(contact_dict, sort_keys=True).encode()).hexdigest()
+    previous = contact_dedup.get(content_hash)
+    if previous is not None:
+        return previous
+
+    contact_dict["_id"] = ObjectId()
+    contact_dict["timestamp"] = utcnow_ms()
     
-    if new_submission:
-        new_submission["id"] = str(new_submission["_id"])
-        del new_submission["_id"]
+    if not contact_writer.submit(contact_dict):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many submissions, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
     
-    return new_submission
+    submission = dict(contact_dict, id=str(contact_dict["_id"]))
+    contact_dedup.set(content_hash, submission)
+    return submission
 
-# Include the router in the main app
-app.include_router(api_router)
+@api_router.get("/limits/stats")
+async def get_limit_stats():
+    """Rate limiter rejections and contact deduplication counters"""
+    return {
+        "rate_limit": write_limiter.stats(),
+        "contact_dedup": {"duplicates": contact_dedup.hits, "tracked": len(contact_dedup)},
+    }
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request, Mongo and component metrics in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@api_router.get("/cache/bus")
+async def get_invalidation_bus_stats():
+    """Cross-worker invalidation counters for this worker"""
+    return dict(invalidation_bus.stats(), enabled=INVALIDATION_BUS == "mongo")
+
+@api_router.get("/contact/queue")
+async def get_contact_queue_stats():
+    """Depth and throughput counters for the contact submission queue"""
+    return contact_writer.stats()
+
+def stats_window(since: Optional[datetime], until: Optional[datetime]):
+    """[since, until) as naive UTC, the last ADMIN_STATS_DAYS days by default"""
+    until = naive_utc(until) or datetime.utcnow()
+    since = naive_utc(since) or until - timedelta(days=ADMIN_STATS_DAYS)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if until - since > timedelta(days=ADMIN_STATS_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Window is limited to {ADMIN_STATS_MAX_DAYS} days")
+    return since, until
+
+async def cached_stats(name: str, compute, since: Optional[datetime], until: Optional[datetime]) -> dict:
+    # Keyed on the parameters as given, so an open-ended "last N days" window
+    # is reused for ADMIN_STATS_TTL_SECONDS rather than missing every second
+    key = (name, since, until)
+    stats = stats_cache.get(key)
+    if stats is None:
+        window_since, window_until = stats_window(since, until)
+        try:
+            stats = await compute(read_db, window_since, window_until)
+        except PyMongoError as e:
+            logger.error("Admin stats aggregation failed: %s", e)
+            raise HTTPException(status_code=503, detail="Stats are temporarily unavailable")
+        stats = dict(stats, since=window_since, until=window_until)
+        stats_cache.set(key, stats)
+    return stats
+
+@api_router.get("/admin/stats")
+async def get_admin_stats(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Contact submissions by type and day and status checks by client and day, in one call"""
+    contacts, status_checks = await asyncio.gather(
+        cached_stats("contacts", contact_stats, since, until),
+        cached_stats("status_checks", status_stats, since, until),
+    )
+    return {"contacts": contacts, "status_checks": status_checks}
+
+@api_router.get("/admin/stats/contacts")
+async def get_contact_stats(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Contact submission counts per type, per day and per type and day within [since, until)"""
+    return await cached_stats("contacts", contact_stats, since, until)
+
+@api_router.get("/admin/stats/status")
+async def get_status_stats(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Status check counts per client_name, per day and per client and day within [since, until)"""
+    return await cached_stats("status_checks", status_stats, since, until)
 
 # Configure logging
 logging.basicConfig(
@@ -212,6 +1020,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+# HTTP caching windows and slow request logging, used by create_app()
+HTTP_CACHE_LONG_SECONDS = int(os.environ.get('HTTP_CACHE_LONG_SECONDS', 3600))
+HTTP_CACHE_SHORT_SECONDS = int(os.environ.get('HTTP_CACHE_SHORT_SECONDS', 30))
+HTTP_CACHE_STALE_SECONDS = int(os.environ.get('HTTP_CACHE_STALE_SECONDS', 86400))
+SLOW_REQUEST_MS = os.environ.get('SLOW_REQUEST_MS')
+
+async def ensure_db_indexes():
+    if os.environ.get('ENSURE_INDEXES', 'true').lower() == 'false':
+        return
+    try:
+        await ensure_indexes(db, status_ttl=int(STATUS_CHECK_TTL_SECONDS) if STATUS_CHECK_TTL_SECONDS else None)
+    except PyMongoError as e:
+        logger.warning("Could not ensure indexes: %s", e)
+
+async def seed_blog_facets():
+    # Databases from before blog_facets existed get their counts built once
+    global facets_seeding
+    facets_seeding = True
+    try:
+        if await db.blog_facets.estimated_document_count() == 0 and await db.blog_posts.find_one({}, {"_id": 1}):
+            count = await facets.rebuild(db)
+            # Evict anything a read cached here or in another worker meanwhile
+            await blog_changed(FACETS_TAG)
+            logger.info("Built %d blog facets", count)
+    except PyMongoError as e:
+        logger.warning("Could not build blog facets: %s", e)
+    finally:
+        facets_seeding = False
+
+async def prepare_database():
+    await ensure_db_indexes()
+    await seed_blog_facets()
+    try:
+        await live_feed.prepare()
+    except PyMongoError as e:
+        # record() and the live feed retry it on first use
+        logger.warning("Could not prepare the live events collection: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker process, after the fork. A database assigned
+    # before startup (tests, bench.py) is used as is and left open.
+    owns_client = db is None
+    if owns_client:
+        connect_mongo()
+    live_feed.configure(db.blog_posts, db.blog_events)
+    # Index builds, the facet seed and the capped events collection are
+    # idempotent upkeep; they run in the background so a new worker takes
+    # traffic as soon as it has booted
+    preparing = asyncio.create_task(prepare_database())
+    if INVALIDATION_BUS == "mongo":
+        # Keeps retrying in the background while Mongo is unreachable
+        await invalidation_bus.start(db.cache_invalidations)
+    await contact_writer.start(db.contact_submissions)
+    try:
+        yield
+    finally:
+        preparing.cancel()
+        await live_feed.stop()
+        await invalidation_bus.stop()
+        # Flush queued contact submissions before the client goes away
+        await contact_writer.stop()
+        if owns_client:
+            close_mongo()
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; Mongo is connected when its lifespan starts.
+
+        uvicorn --factory server:create_app
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(api_router)
+
+    # Added before CORS so rejections still carry CORS headers
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=write_limiter,
+        routes=RATE_LIMITED_ROUTES,
+        trust_forwarded=os.environ.get('TRUST_FORWARDED_FOR', 'false').lower() == 'true',
+    )
+
+    # HTTP caching: long for single posts and the category list, short for
+    # listings and counts; responses to writes are never stored
+    long_cache = cache_policy(HTTP_CACHE_LONG_SECONDS, HTTP_CACHE_STALE_SECONDS)
+    short_cache = cache_policy(HTTP_CACHE_SHORT_SECONDS, HTTP_CACHE_STALE_SECONDS)
+    admin_cache = cache_policy(ADMIN_STATS_TTL_SECONDS, public=False)
+    app.add_middleware(
+        CacheControlMiddleware,
+        policies={
+            "/api/blog/posts/{post_id}": long_cache,
+            "/api/blog/categories": long_cache,
+            "/api/blog/posts": short_cache,
+            "/api/blog/facets": short_cache,
+            "/api/blog/search": short_cache,
+            # Admin numbers stay out of shared caches
+            "/api/admin/stats": admin_cache,
+            "/api/admin/stats/contacts": admin_cache,
+            "/api/admin/stats/status": admin_cache,
+        },
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
+    )
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', 1024)),
+        gzip_level=int(os.environ.get('GZIP_LEVEL', 6)),
+        brotli_quality=int(os.environ.get('BROTLI_QUALITY', 4)),
+    )
+
+    # Outermost, so timings cover every other middleware
+    app.add_middleware(
+        MetricsMiddleware,
+        slow_request_seconds=float(SLOW_REQUEST_MS) / 1000 if SLOW_REQUEST_MS else None,
+    )
+    return app
+
+def __getattr__(name):
+    # ``server:app`` keeps working, built on first access rather than on import
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,178 @@
+"""Pre-render blog_posts into static JSON files.
+
+    python snapshot.py ../frontend/public/blog-data
+    python snapshot.py ../frontend/public/blog-data --blog-json ../frontend/src/data/blog.json
+
+Layout of the output directory:
+
+    index/page-<n>.json   newest-first post summaries, ``--page-size`` per page
+    posts/<id>.json       one full post per file
+    categories.json       count, latest date, ids and index pages per category
+    manifest.json         post id -> revision as of the last run
+
+Runs are incremental: a post file is rewritten only when the post's
+revision differs from the manifest, files of deleted posts are removed,
+and index files are only replaced when their bytes change.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Same fields as BlogPostSummary in server.py, plus the revision
+SUMMARY_PROJECTION = {
+    "title": 1, "category": 1, "date": 1, "excerpt": 1,
+    "tags": 1, "readTime": 1, "wordCount": 1, "author": 1, "revision": 1,
+}
+SORT = [("date", -1), ("_id", -1)]
+FETCH_BATCH_SIZE = 200
+
+
+def to_json(post: dict) -> dict:
+    post = dict(post)
+    post["id"] = str(post.pop("_id"))
+    for field in ("date", "updatedAt"):
+        if isinstance(post.get(field), datetime):
+            # Stored naive in UTC; mark it so browsers do not read it as local time
+            post[field] = post[field].replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+    return post
+
+
+def write_if_changed(path: Path, data) -> bool:
+    """Atomically write ``data`` as JSON unless the file already holds the same bytes"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if path.exists() and path.read_bytes() == payload:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+    return True
+
+
+async def generate_snapshot(db, out_dir: Path, page_size: int = 20) -> dict:
+    manifest_path = out_dir / "manifest.json"
+    previous = json.loads(manifest_path.read_text()).get("posts", {}) if manifest_path.exists() else {}
+    stats = {"posts": 0, "posts_written": 0, "posts_removed": 0, "pages_written": 0}
+
+    # Pass 1: stream summaries in listing order to build pages and categories
+    revisions = {}
+    categories = {}
+    page, page_number = [], 1
+    total = await db.blog_posts.count_documents({})
+    pages = max(1, -(-total // page_size))
+
+    def flush_page():
+        nonlocal page, page_number
+        data = {
+            "page": page_number,
+            "pages": pages,
+            "next": f"page-{page_number + 1}.json" if page_number < pages else None,
+            "posts": page,
+        }
+        if write_if_changed(out_dir / "index" / f"page-{page_number}.json", data):
+            stats["pages_written"] += 1
+        page, page_number = [], page_number + 1
+
+    async for doc in db.blog_posts.find({}, SUMMARY_PROJECTION).sort(SORT).batch_size(FETCH_BATCH_SIZE):
+        post = to_json(doc)
+        revisions[post["id"]] = post.pop("revision", 0)
+        page.append(post)
+        entry = categories.setdefault(post["category"], {"count": 0, "latest": post["date"], "ids": [], "pages": []})
+        entry["count"] += 1
+        entry["ids"].append(post["id"])
+        if page_number not in entry["pages"]:
+            entry["pages"].append(page_number)
+        if len(page) == page_size:
+            flush_page()
+    if page or page_number == 1:
+        flush_page()
+    stats["posts"] = len(revisions)
+
+    # Drop index pages left over from a larger collection
+    for stale in (out_dir / "index").glob("page-*.json"):
+        if int(stale.stem.split("-")[1]) > pages:
+            stale.unlink()
+
+    # Pass 2: fetch full documents only for new or changed posts
+    posts_dir = out_dir / "posts"
+    changed = [
+        post_id for post_id, revision in revisions.items()
+        if previous.get(post_id) != revision or not (posts_dir / f"{post_id}.json").exists()
+    ]
+    for start in range(0, len(changed), FETCH_BATCH_SIZE):
+        ids = [ObjectId(post_id) for post_id in changed[start:start + FETCH_BATCH_SIZE]]
+        async for doc in db.blog_posts.find({"_id": {"$in": ids}}):
+            post = to_json(doc)
+            post.pop("revision", None)
+            if write_if_changed(posts_dir / f"{post['id']}.json", post):
+                stats["posts_written"] += 1
+
+    for post_id in set(previous) - set(revisions):
+        (posts_dir / f"{post_id}.json").unlink(missing_ok=True)
+        stats["posts_removed"] += 1
+
+    write_if_changed(out_dir / "categories.json", categories)
+    write_if_changed(manifest_path, {"posts": revisions})
+    return stats
+
+
+async def write_blog_json(db, path: Path) -> bool:
+    """Stream every full post into the {"posts": [...]} file read by useLocalData.js"""
+    digest = hashlib.sha256()
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        def emit(text):
+            digest.update(text.encode("utf-8"))
+            f.write(text)
+        emit('{\n  "posts": [')
+        first = True
+        async for doc in db.blog_posts.find().sort(SORT).batch_size(FETCH_BATCH_SIZE):
+            post = to_json(doc)
+            post.pop("revision", None)
+            emit(("\n    " if first else ",\n    ") + json.dumps(post, ensure_ascii=False))
+            first = False
+        emit("\n  ]\n}\n")
+    if path.exists() and hashlib.sha256(path.read_bytes()).digest() == digest.digest():
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", type=Path, help="directory to write the snapshot into")
+    parser.add_argument("--page-size", type=int, default=20, help="posts per index page")
+    parser.add_argument("--blog-json", type=Path, help="also write a blog.json file for the static pages")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    async def run():
+        stats = await generate_snapshot(db, args.out_dir, args.page_size)
+        print(
+            f"{stats['posts']} posts: {stats['posts_written']} written, "
+            f"{stats['posts_removed']} removed, {stats['pages_written']} index pages updated"
+        )
+        if args.blog_json:
+            changed = await write_blog_json(db, args.blog_json)
+            print(f"{args.blog_json}: {'updated' if changed else 'unchanged'}")
+
+    try:
+        asyncio.run(run())
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Measure how quickly a fresh worker process becomes ready, as JSON.
+
+    python startup_bench.py
+    python startup_bench.py --runs 10 --budget 0.8 -o startup.json
+
+Two numbers are taken in new interpreter processes, ``--runs`` times each:
+
+- import: seconds spent in ``import server``
+- first_request: seconds from spawning ``uvicorn --factory server:create_app``
+  until ``GET /api/`` answers 200
+
+``/api/`` does not touch Mongo, so no database is needed. The exit code
+is 1 when the median time to first request exceeds ``--budget``.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from bench import git_commit
+
+BACKEND_DIR = Path(__file__).parent
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+
+
+def worker_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "portfolio_bench")
+    env.setdefault("ENSURE_INDEXES", "false")
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=worker_env(),
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_first_request(timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "server:create_app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=worker_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn exited early:\n{process.stderr.read().decode()}")
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise SystemExit(f"no response from {url} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summarize(samples) -> dict:
+    return {
+        "min_s": round(min(samples), 4),
+        "median_s": round(statistics.median(samples), 4),
+        "max_s": round(max(samples), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="processes to start per measurement")
+    parser.add_argument("--budget", type=float, default=1.0, help="allowed median seconds to first request")
+    parser.add_argument("--timeout", type=float, default=30.0, help="give up on a worker after this long")
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    first_requests = [time_first_request(args.timeout) for _ in range(args.runs)]
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "budget_s": args.budget,
+        "import": summarize(imports),
+        "first_request": summarize(first_requests),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    if report["first_request"]["median_s"] > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -172,6 +172,58 @@ class BlogAPITester:
         except Exception as e:
             self.log_result("Limit Parameter", False, f"Error: {str(e)}")
     
+    def test_cursor_pagination(self):
+        """Test walking the post listing page by page with keyset cursors"""
+        print("\n=== Testing Cursor Pagination ===")
+        try:
+            seen_ids = []
+            cursor = None
+            while True:
+                params = {"limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                response = requests.get(f"{self.base_url}/blog/posts", params=params)
+                if response.status_code != 200:
+                    self.log_result("Cursor Pagination", False, f"Status: {response.status_code}")
+                    return
+                seen_ids.extend(post["id"] for post in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+
+            if len(seen_ids) == len(set(seen_ids)) and set(self.created_posts).issubset(seen_ids):
+                self.log_result("Cursor Pagination", True, f"Walked {len(seen_ids)} posts without duplicates")
+            else:
+                self.log_result("Cursor Pagination", False, "Pages overlapped or skipped posts")
+        except Exception as e:
+            self.log_result("Cursor Pagination", False, f"Error: {str(e)}")
+
+        # Test with a malformed cursor
+        try:
+            response = requests.get(f"{self.base_url}/blog/posts?cursor=not-a-cursor")
+            if response.status_code == 400:
+                self.log_result("Cursor Pagination - Invalid Cursor", True, "Correctly returned 400 for invalid cursor")
+            else:
+                self.log_result("Cursor Pagination - Invalid Cursor", False, f"Expected 400, got {response.status_code}")
+        except Exception as e:
+            self.log_result("Cursor Pagination - Invalid Cursor", False, f"Error: {str(e)}")
+    
+    def test_summary_view(self):
+        """Test the content-free summary listing"""
+        print("\n=== Testing Summary View ===")
+        try:
+            response = requests.get(f"{self.base_url}/blog/posts?view=summary")
+            if response.status_code == 200:
+                posts = response.json()
+                if posts and all("content" not in post and "excerpt" in post for post in posts):
+                    self.log_result("Summary View", True, f"Retrieved {len(posts)} posts without content")
+                else:
+                    self.log_result("Summary View", False, "Posts missing or still include content")
+            else:
+                self.log_result("Summary View", False, f"Status: {response.status_code}")
+        except Exception as e:
+            self.log_result("Summary View", False, f"Error: {str(e)}")
+    
     def test_get_single_post(self):
         """Test retrieving a single blog post by ID"""
         print("\n=== Testing Get Single Blog Post ===")
@@ -204,6 +256,29 @@ class BlogAPITester:
         except Exception as e:
             self.log_result("Get Single Post - Invalid ID", False, f"Error: {str(e)}")
     
+    def test_conditional_get(self):
+        """Test ETag revalidation of a single post"""
+        print("\n=== Testing Conditional GET ===")
+        
+        if not self.created_posts:
+            self.log_result("Conditional GET", False, "No posts available for testing")
+            return
+        
+        post_id = self.created_posts[0]
+        try:
+            response = requests.get(f"{self.base_url}/blog/posts/{post_id}")
+            etag = response.headers.get("ETag")
+            if not etag or "Last-Modified" not in response.headers:
+                self.log_result("Conditional GET", False, "Missing ETag or Last-Modified header")
+                return
+            response = requests.get(f"{self.base_url}/blog/posts/{post_id}", headers={"If-None-Match": etag})
+            if response.status_code == 304:
+                self.log_result("Conditional GET", True, "Unchanged post returned 304")
+            else:
+                self.log_result("Conditional GET", False, f"Expected 304, got {response.status_code}")
+        except Exception as e:
+            self.log_result("Conditional GET", False, f"Error: {str(e)}")
+    
     def test_update_blog_post(self):
         """Test updating blog posts"""
         print("\n=== Testing Blog Post Updates ===")
@@ -242,6 +317,39 @@ class BlogAPITester:
         except Exception as e:
             self.log_result("Update Blog Post - Invalid ID", False, f"Error: {str(e)}")
     
+    def test_conditional_update(self):
+        """Test revision preconditions, tag edits and no-op updates"""
+        print("\n=== Testing Conditional Updates ===")
+        
+        if not self.created_posts:
+            self.log_result("Conditional Update", False, "No posts available for testing")
+            return
+        
+        url = f"{self.base_url}/blog/posts/{self.created_posts[1]}"
+        try:
+            post = requests.get(url).json()
+            noop = requests.put(url, json={"title": post["title"]})
+            if noop.status_code == 200 and noop.json()["revision"] == post["revision"]:
+                self.log_result("Conditional Update - No-op", True, "Unchanged update skipped the write")
+            else:
+                self.log_result("Conditional Update - No-op", False, f"Status: {noop.status_code}, Response: {noop.text}")
+            
+            tagged = requests.patch(url, json={"addTags": ["reviewed"], "removeTags": post["tags"][:1]},
+                                    headers={"If-Match": noop.headers.get("ETag", "")})
+            tags = tagged.json().get("tags", []) if tagged.status_code == 200 else []
+            if "reviewed" in tags and post["tags"][0] not in tags:
+                self.log_result("Conditional Update - Tags", True, f"Tags now {tags}")
+            else:
+                self.log_result("Conditional Update - Tags", False, f"Status: {tagged.status_code}, Response: {tagged.text}")
+            
+            stale = requests.put(url, json={"title": "Stale edit", "revision": post["revision"]})
+            if stale.status_code == 409:
+                self.log_result("Conditional Update - Stale Revision", True, "Correctly returned 409")
+            else:
+                self.log_result("Conditional Update - Stale Revision", False, f"Expected 409, got {stale.status_code}")
+        except Exception as e:
+            self.log_result("Conditional Update", False, f"Error: {str(e)}")
+    
     def test_get_categories(self):
         """Test retrieving blog categories"""
         print("\n=== Testing Get Blog Categories ===")
@@ -266,6 +374,85 @@ class BlogAPITester:
         except Exception as e:
             self.log_result("Get Categories", False, f"Error: {str(e)}")
     
+    def test_facets(self):
+        """Test category and tag counts match the posts"""
+        print("\n=== Testing Blog Facets ===")
+        try:
+            response = requests.get(f"{self.base_url}/blog/facets")
+            posts = requests.get(f"{self.base_url}/blog/posts", params={"limit": 200, "view": "summary"}).json()
+            if response.status_code == 200:
+                data = response.json()
+                counts = {facet["name"]: facet["count"] for facet in data.get("categories", [])}
+                expected = {}
+                for post in posts:
+                    expected[post["category"]] = expected.get(post["category"], 0) + 1
+                if counts == expected and isinstance(data.get("tags"), list):
+                    self.log_result("Blog Facets", True, f"Category counts: {counts}")
+                else:
+                    self.log_result("Blog Facets", False, f"Expected {expected}, got {counts}")
+            else:
+                self.log_result("Blog Facets", False, f"Status: {response.status_code}")
+        except Exception as e:
+            self.log_result("Blog Facets", False, f"Error: {str(e)}")
+    
+    def test_admin_stats(self):
+        """Test aggregated contact and status check counts"""
+        print("\n=== Testing Admin Stats ===")
+        try:
+            response = requests.get(f"{self.base_url}/admin/stats", timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                contacts, status_checks = data.get("contacts", {}), data.get("status_checks", {})
+                if "by_type" in contacts and "by_day" in contacts and "by_client_name" in status_checks:
+                    self.log_result("Admin Stats", True,
+                                    f"{contacts['total']} contacts, {status_checks['total']} status checks")
+                else:
+                    self.log_result("Admin Stats", False, f"Unexpected shape: {list(data)}")
+            else:
+                self.log_result("Admin Stats", False, f"Status: {response.status_code}")
+        except Exception as e:
+            self.log_result("Admin Stats", False, f"Error: {str(e)}")
+    
+    def test_live_feed(self):
+        """Test the Server-Sent Events feed opens with a retry hint"""
+        print("\n=== Testing Live Feed ===")
+        try:
+            with requests.get(f"{self.base_url}/blog/live", stream=True, timeout=10) as response:
+                content_type = response.headers.get("content-type", "")
+                first_line = next(response.iter_lines(decode_unicode=True), "")
+            if response.status_code == 200 and content_type.startswith("text/event-stream") and first_line.startswith("retry:"):
+                self.log_result("Live Feed", True, "Event stream opened")
+            else:
+                self.log_result("Live Feed", False, f"Status: {response.status_code}, Content-Type: {content_type}")
+        except Exception as e:
+            self.log_result("Live Feed", False, f"Error: {str(e)}")
+    
+    def test_search(self):
+        """Test full-text search with ranking and snippets"""
+        print("\n=== Testing Blog Search ===")
+        try:
+            response = requests.get(f"{self.base_url}/blog/search", params={"q": "quantum cryptography"})
+            if response.status_code == 200:
+                results = response.json().get("results", [])
+                if results and "Quantum" in results[0]["title"] and "<mark>" in results[0]["snippet"]:
+                    self.log_result("Blog Search", True, f"Top hit: {results[0]['title'][:50]}...")
+                else:
+                    self.log_result("Blog Search", False, f"Unexpected ranking or snippet: {results[:1]}")
+            else:
+                self.log_result("Blog Search", False, f"Status: {response.status_code}")
+        except Exception as e:
+            self.log_result("Blog Search", False, f"Error: {str(e)}")
+        
+        # Test with an empty query
+        try:
+            response = requests.get(f"{self.base_url}/blog/search", params={"q": ""})
+            if response.status_code == 422:
+                self.log_result("Blog Search - Empty Query", True, "Correctly rejected empty query")
+            else:
+                self.log_result("Blog Search - Empty Query", False, f"Expected 422, got {response.status_code}")
+        except Exception as e:
+            self.log_result("Blog Search - Empty Query", False, f"Error: {str(e)}")
+    
     def test_contact_form(self):
         """Test contact form submission"""
         print("\n=== Testing Contact Form ===")
@@ -280,7 +467,7 @@ class BlogAPITester:
         
         try:
             response = requests.post(f"{self.base_url}/contact", json=contact_data)
-            if response.status_code == 200:
+            if response.status_code == 202:  # Accepted, written in the next batch
                 submission = response.json()
                 required_fields = ["id", "name", "email", "subject", "message", "type", "timestamp"]
                 missing_fields = [field for field in required_fields if field not in submission]
@@ -370,9 +557,17 @@ class BlogAPITester:
         self.test_create_blog_posts()
         self.test_get_all_posts()
         self.test_get_posts_with_filters()
+        self.test_cursor_pagination()
+        self.test_summary_view()
         self.test_get_single_post()
+        self.test_conditional_get()
         self.test_update_blog_post()
+        self.test_conditional_update()
         self.test_get_categories()
+        self.test_facets()
+        self.test_live_feed()
+        self.test_admin_stats()
+        self.test_search()
         self.test_contact_form()
         self.test_delete_blog_post()
         
@@ -27,15 +27,25 @@ const Admin = () => {
     excerpt: '',
     content: '',
     tags: '',
-    readTime: '5 min read',
     author: '[Your Name]'
   });
 
   // Fetch blog posts
   const fetchPosts = async () => {
     try {
-      const response = await axios.get(`${API}/blog/posts`);
-      setPosts(response.data);
+      // Follow the pagination cursor so the admin list shows every post
+      let allPosts = [];
+      let cursor = null;
+      do {
+        // Revalidate instead of reusing the briefly cacheable listing, so edits show up at once
+        const response = await axios.get(`${API}/blog/posts`, {
+          params: cursor ? { cursor } : {},
+          headers: { 'Cache-Control': 'no-cache' }
+        });
+        allPosts = allPosts.concat(response.data);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      setPosts(allPosts);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching posts:', error);
@@ -67,7 +77,6 @@ const Admin = () => {
       excerpt: '',
       content: '',
       tags: '',
-      readTime: '5 min read',
       author: '[Your Name]'
     });
     setEditingPost(null);
@@ -84,8 +93,11 @@ const Admin = () => {
       };
 
       if (editingPost) {
-        // Update existing post
-        await axios.put(`${API}/blog/posts/${editingPost.id}`, submitData);
+        // Update existing post, failing if someone else saved it since it was loaded
+        await axios.put(`${API}/blog/posts/${editingPost.id}`, {
+          ...submitData,
+          revision: editingPost.revision
+        });
         toast({
           title: "Success!",
           description: "Blog post updated successfully"
@@ -103,6 +115,15 @@ const Admin = () => {
       fetchPosts();
     } catch (error) {
       console.error('Error saving post:', error);
+      if (error.response?.status === 409) {
+        toast({
+          title: "Post changed",
+          description: "Someone else saved this post while you were editing it. Reload to see their changes.",
+          variant: "destructive"
+        });
+        fetchPosts();
+        return;
+      }
       toast({
         title: "Error",
         description: "Failed to save blog post",
@@ -118,7 +139,6 @@ const Admin = () => {
       excerpt: post.excerpt,
       content: post.content,
       tags: post.tags.join(', '),
-      readTime: post.readTime,
       author: post.author
     });
     setEditingPost(post);
@@ -229,14 +249,13 @@ const Admin = () => {
                 </div>
 
                 <div>
-                  <Label htmlFor="excerpt">Excerpt *</Label>
+                  <Label htmlFor="excerpt">Excerpt</Label>
                   <Textarea
                     id="excerpt"
                     name="excerpt"
                     value={formData.excerpt}
                     onChange={handleInputChange}
-                    required
-                    placeholder="Brief description of the post"
+                    placeholder="Brief description of the post (leave empty to use the first paragraph)"
                     className="min-h-[80px]"
                   />
                 </div>
@@ -254,7 +273,7 @@ const Admin = () => {
                   />
                 </div>
 
-                <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+                <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
                   <div>
                     <Label htmlFor="tags">Tags (comma separated)</Label>
                     <Input
@@ -265,16 +284,6 @@ const Admin = () => {
                       placeholder="e.g. Research, Analysis, AI"
                     />
                   </div>
-                  <div>
-                    <Label htmlFor="readTime">Read Time</Label>
-                    <Input
-                      id="readTime"
-                      name="readTime"
-                      value={formData.readTime}
-                      onChange={handleInputChange}
-                      placeholder="5 min read"
-                    />
-                  </div>
                   <div>
                     <Label htmlFor="author">Author</Label>
                     <Input
@@ -22,7 +22,7 @@ const BlogPost = () => {
         setPost(response.data);
         
         // Fetch related posts
-        const relatedResponse = await axios.get(`${API}/blog/posts?limit=3`);
+        const relatedResponse = await axios.get(`${API}/blog/posts?limit=3&view=summary`);
         const allPosts = relatedResponse.data;
         const related = allPosts.filter(p => 
           p.id !== id && (
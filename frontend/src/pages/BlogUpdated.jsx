@@ -16,28 +16,82 @@ const BlogUpdated = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('All');
   const [categories, setCategories] = useState(['All']);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  // Fetch blog posts
-  const fetchBlogPosts = async () => {
+  // Fetch one page of blog posts; without a cursor the list starts over
+  const fetchBlogPosts = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/blog/posts`);
+      const params = { view: 'summary' };
+      if (selectedCategory !== 'All') params.category = selectedCategory;
+      if (cursor) params.cursor = cursor;
+      const response = await axios.get(`${API}/blog/posts`, { params });
       const posts = response.data;
-      setBlogPosts(posts);
-      
-      // Extract unique categories
-      const uniqueCategories = ['All', ...new Set(posts.map(post => post.category))];
-      setCategories(uniqueCategories);
-      setLoading(false);
+      setBlogPosts(prev => (cursor ? [...prev, ...posts] : posts));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching blog posts:', error);
+    } finally {
       setLoading(false);
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchBlogPosts(nextCursor);
+  };
+
+  // Categories come from the server so the filter covers every post, not just loaded pages
+  const fetchCategories = async () => {
+    try {
+      const response = await axios.get(`${API}/blog/categories`);
+      setCategories(['All', ...response.data.categories]);
+    } catch (error) {
+      console.error('Error fetching categories:', error);
     }
   };
 
   useEffect(() => {
-    fetchBlogPosts();
+    fetchCategories();
   }, []);
 
+  // The category filter is applied by the server, one page at a time
+  useEffect(() => {
+    fetchBlogPosts();
+  }, [selectedCategory]);
+
+  // Apply live post changes instead of re-polling the listing
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+    const source = new EventSource(`${API}/blog/live`);
+    source.addEventListener('post', (e) => {
+      const change = JSON.parse(e.data);
+      const category = change.op === 'create' ? change.post.category : change.fields && change.fields.category;
+      if (category) {
+        setCategories(prev => (prev.includes(category) ? prev : [...prev, category]));
+      }
+      setBlogPosts(prev => {
+        if (change.op === 'create') {
+          if (selectedCategory !== 'All' && change.post.category !== selectedCategory) return prev;
+          return [change.post, ...prev.filter(post => post.id !== change.id)];
+        }
+        if (change.op === 'update') {
+          return prev
+            .map(post => (post.id === change.id ? { ...post, ...change.fields } : post))
+            .filter(post => selectedCategory === 'All' || post.category === selectedCategory);
+        }
+        return prev.filter(post => post.id !== change.id);
+      });
+    });
+    // Events were missed; start over from the first page
+    source.addEventListener('reset', () => {
+      fetchBlogPosts();
+      fetchCategories();
+    });
+    return () => source.close();
+  }, [selectedCategory]);
+
   const filteredPosts = blogPosts.filter(post => {
     const matchesSearch = post.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
                          post.excerpt.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -229,6 +283,14 @@ const BlogUpdated = () => {
           </div>
         )}
 
+        {nextCursor && (
+          <div className="mt-12 text-center">
+            <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load More Articles'}
+            </Button>
+          </div>
+        )}
+
         {/* Call to Action */}
         {filteredPosts.length > 0 && (
           <div className="mt-20 text-center">
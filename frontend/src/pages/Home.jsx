@@ -19,7 +19,7 @@ const Home = () => {
   useEffect(() => {
     const fetchBlogPosts = async () => {
       try {
-        const response = await axios.get(`${API}/blog/posts?limit=3`);
+        const response = await axios.get(`${API}/blog/posts?limit=3&view=summary`);
         setBlogPosts(response.data);
       } catch (error) {
         console.error('Error fetching blog posts:', error);
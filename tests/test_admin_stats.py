@@ -0,0 +1,50 @@
+"""Admin stats: window pipeline shape and rolling rows up into totals."""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from admin_stats import contact_pipeline, roll_up, status_pipeline  # noqa: E402
+
+JAN_1 = datetime(2026, 1, 1)
+JAN_2 = datetime(2026, 1, 2, 9)
+
+
+def row(key, day, count, latest):
+    return {"_id": {"key": key, "day": day}, "count": count, "latest": latest}
+
+
+def test_pipeline_reads_only_indexed_fields():
+    for pipeline, field in ((contact_pipeline(JAN_1, JAN_2), "type"), (status_pipeline(JAN_1, JAN_2), "client_name")):
+        assert pipeline[0] == {"$match": {"timestamp": {"$gte": JAN_1, "$lt": JAN_2}}}
+        # Projecting away _id lets the timestamp_<field> index cover the query
+        assert pipeline[1] == {"$project": {"_id": 0, "timestamp": 1, field: 1}}
+
+
+def test_missing_contact_type_counts_as_general():
+    group_key = contact_pipeline(JAN_1, JAN_2)[2]["$group"]["_id"]["key"]
+    assert group_key == {"$ifNull": ["$type", "general"]}
+
+
+def test_roll_up_totals_per_key_and_day():
+    stats = roll_up([
+        row("general", "2026-01-02", 2, JAN_2),
+        row("research", "2026-01-01", 1, JAN_1),
+        row("general", "2026-01-01", 1, JAN_1),
+    ], "type")
+    assert stats["total"] == 4
+    assert stats["by_type"] == [
+        {"type": "general", "count": 3, "latest": JAN_2},
+        {"type": "research", "count": 1, "latest": JAN_1},
+    ]
+    assert stats["by_day"] == [{"day": "2026-01-01", "count": 2}, {"day": "2026-01-02", "count": 2}]
+    assert [(entry["day"], entry["type"]) for entry in stats["by_type_day"]] == [
+        ("2026-01-01", "general"), ("2026-01-01", "research"), ("2026-01-02", "general"),
+    ]
+
+
+def test_roll_up_of_nothing():
+    assert roll_up([], "client_name") == {
+        "total": 0, "by_client_name": [], "by_day": [], "by_client_name_day": [],
+    }
@@ -0,0 +1,59 @@
+"""Read cache: TTL expiry, LRU eviction and tag invalidation."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import cache  # noqa: E402
+from cache import TTLCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    entries = TTLCache(maxsize=10, ttl=5)
+    entries.set("a", 1)
+    clock.now += 4.9
+    assert entries.get("a") == 1
+    clock.now += 0.2
+    assert entries.get("a") is None
+    assert len(entries) == 0
+    assert (entries.hits, entries.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    entries = TTLCache(maxsize=2, ttl=60)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+    assert entries.get("b") is None
+    assert entries.get("a") == 1 and entries.get("c") == 3
+    assert entries.evictions == 1
+
+
+def test_invalidate_drops_every_entry_with_a_tag():
+    entries = TTLCache(maxsize=10, ttl=60)
+    entries.set("page1", 1, ["posts:*", "post:1"])
+    entries.set("page2", 2, ["posts:*", "post:2"])
+    entries.set("post1", 3, ["post:1"])
+    assert entries.invalidate("post:1") == 2
+    assert entries.get("page1") is None and entries.get("post1") is None
+    assert entries.get("page2") == 2
+    assert entries.invalidate("post:1") == 0
+
+
+def test_replacing_an_entry_drops_its_old_tags():
+    entries = TTLCache(maxsize=10, ttl=60)
+    entries.set("k", 1, ["old"])
+    entries.set("k", 2, ["new"])
+    assert entries.invalidate("old") == 0
+    assert entries.get("k") == 2
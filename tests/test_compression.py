@@ -0,0 +1,87 @@
+"""Compression negotiation, size threshold and streaming."""
+import sys
+from pathlib import Path
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import compression  # noqa: E402
+from compression import CompressionMiddleware  # noqa: E402
+
+BIG = "lorem ipsum " * 500
+
+
+async def big(request):
+    return PlainTextResponse(BIG)
+
+
+async def tagged(request):
+    return PlainTextResponse(BIG, headers={"ETag": '"abc-1"'})
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def stream(request):
+    async def lines():
+        for i in range(100):
+            yield f'{{"line": {i}}}\n'
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def events(request):
+    async def lines():
+        yield "data: hello\n\n"
+    return StreamingResponse(lines(), media_type="text/event-stream")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    endpoints = [("/big", big), ("/tagged", tagged), ("/small", small), ("/stream", stream), ("/events", events)]
+    app = Starlette(routes=[Route(path, endpoint) for path, endpoint in endpoints])
+    return TestClient(CompressionMiddleware(app, minimum_size=100))
+
+
+def test_large_body_is_gzipped(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == BIG
+
+
+def test_encoded_body_gets_a_weak_etag(client):
+    assert client.get("/tagged", headers={"Accept-Encoding": "gzip"}).headers["etag"] == 'W/"abc-1"'
+    assert client.get("/tagged", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"abc-1"'
+
+
+def test_small_body_and_unaccepted_encodings_pass_through(client):
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "br"}).headers
+
+
+def test_stream_is_compressed_incrementally(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.count("\n") == 100
+
+
+def test_event_stream_is_not_compressed(client):
+    assert "content-encoding" not in client.get("/events", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_brotli_preferred_when_installed():
+    pytest.importorskip("brotli")
+    app = Starlette(routes=[Route("/big", big)])
+    response = TestClient(CompressionMiddleware(app)).get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.text == BIG
@@ -0,0 +1,77 @@
+"""Contact batch writer: flushing by size, by interval and on shutdown."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from contact_queue import BatchWriter  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append([doc["n"] for doc in docs])
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval():
+    async def scenario():
+        writer, collection = BatchWriter(batch_size=3, flush_interval=0.5), FakeCollection()
+        await writer.start(collection)
+        for n in range(3):
+            writer.submit({"n": n})
+        for _ in range(50):
+            if collection.batches:
+                break
+            await asyncio.sleep(0.01)
+        assert collection.batches == [[0, 1, 2]]
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_partial_batch_is_written_after_the_interval():
+    async def scenario():
+        writer, collection = BatchWriter(batch_size=100, flush_interval=0.05), FakeCollection()
+        await writer.start(collection)
+        writer.submit({"n": 1})
+        writer.submit({"n": 2})
+        await asyncio.sleep(0.2)
+        assert collection.batches == [[1, 2]]
+        assert writer.stats()["written"] == 2
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_drains_the_queue():
+    async def scenario():
+        writer, collection = BatchWriter(batch_size=2, flush_interval=0.5), FakeCollection()
+        await writer.start(collection)
+        for n in range(5):
+            writer.submit({"n": n})
+        await writer.stop()
+        assert sum(collection.batches, []) == [0, 1, 2, 3, 4]
+        assert all(len(batch) <= 2 for batch in collection.batches)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_submissions():
+    writer = BatchWriter(max_queue=2)
+    assert writer.submit({"n": 1}) and writer.submit({"n": 2})
+    assert not writer.submit({"n": 3})
+    assert writer.stats()["rejected"] == 1
+
+
+def test_restarts_on_a_new_event_loop():
+    writer, collection = BatchWriter(flush_interval=0.01), FakeCollection()
+    for n in range(2):
+        async def scenario():
+            await writer.start(collection)
+            writer.submit({"n": n})
+            await writer.stop()
+        asyncio.run(scenario())
+    assert sum(collection.batches, []) == [0, 1]
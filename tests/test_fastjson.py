@@ -0,0 +1,75 @@
+"""Contract tests: the fast JSON path must match FastAPI's validated output."""
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+
+import fastjson  # noqa: E402
+import server  # noqa: E402
+
+FULL_POST = {
+    "id": "6ad325f5dc7a476d4a1a2a78",
+    "title": "Machine Learning Applications in Climate Science",
+    "category": "Research",
+    "date": datetime(2024, 12, 20, 8, 30, 15, 123000),
+    "excerpt": "Exploring how deep learning models can improve climate prediction.",
+    "content": "Climate science has always been data-intensive…\n\nÜnïcödé paragraph.",
+    "tags": ["machine-learning", "climate-science"],
+    "readTime": "8 min read",
+    "wordCount": 1540,
+    "author": "Dr. Sarah Chen",
+    "revision": 3,
+    "updatedAt": datetime(2024, 12, 21, 0, 0, 0),
+    "toc": [{"level": 2, "title": "Methods", "anchor": "methods"}],
+    "contentHash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+    "excerptAuto": False,
+}
+
+# A post written before revision/updatedAt existed, with a stray extra field
+LEGACY_POST = {
+    "id": "6ad325f5dc7a476d4a1a2a79",
+    "title": "Welcome",
+    "category": "Personal",
+    "date": datetime(2024, 1, 1),
+    "excerpt": "First post",
+    "content": "Hello",
+    "tags": [],
+    "readTime": "5 min read",
+    "author": "[Your Name]",
+    "legacyField": "dropped",
+}
+
+
+def pydantic_bytes(model, docs) -> bytes:
+    adapter = TypeAdapter(List[model])
+    return JSONResponse(jsonable_encoder(adapter.validate_python(docs))).body
+
+
+@pytest.mark.parametrize("model", [server.BlogPost, server.BlogPostSummary])
+def test_fast_path_matches_validated_output(model):
+    docs = [FULL_POST, LEGACY_POST]
+    shape = fastjson.shaper(model)
+    assert fastjson.dumps([shape(doc) for doc in docs]) == pydantic_bytes(model, docs)
+
+
+def test_stdlib_fallback_matches_validated_output(monkeypatch):
+    monkeypatch.setattr(fastjson, "orjson", None)
+    shape = fastjson.shaper(server.BlogPost)
+    docs = [FULL_POST, LEGACY_POST]
+    assert fastjson.dumps([shape(doc) for doc in docs]) == pydantic_bytes(server.BlogPost, docs)
+
+
+def test_status_checks_match_validated_output():
+    docs = [{"id": "4d505274", "client_name": "monitor", "timestamp": datetime(2024, 5, 1, 12, 0, 0, 500000)}]
+    shape = fastjson.shaper(server.StatusCheck)
+    assert fastjson.dumps([shape(doc) for doc in docs]) == pydantic_bytes(server.StatusCheck, docs)
@@ -0,0 +1,59 @@
+"""Index upkeep: INDEXES is created, retired indexes are dropped and the status TTL survives reruns."""
+import asyncio
+import sys
+from pathlib import Path
+
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import DESCENDING
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import indexes  # noqa: E402
+from indexes import INDEXES, ensure_indexes, missing_indexes  # noqa: E402
+
+
+def test_ensure_indexes_drops_the_retired_contact_timestamp_index():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await db.contact_submissions.create_index([("timestamp", DESCENDING)], name="timestamp")
+        await ensure_indexes(db)
+        assert await missing_indexes(db) == {}
+        contact = await db.contact_submissions.index_information()
+        assert "timestamp" not in contact and "timestamp_type" in contact
+        # status_checks keeps its own timestamp index for the TTL
+        assert "timestamp" in await db.status_checks.index_information()
+    asyncio.run(scenario())
+
+
+def test_retired_indexes_are_not_recreated():
+    names = [model.document["name"] for model in INDEXES["contact_submissions"]]
+    assert "timestamp" not in names
+
+
+def test_ensure_indexes_with_a_ttl_can_run_again():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await ensure_indexes(db, status_ttl=3600)
+        # Used to resend the timestamp index without its TTL: IndexOptionsConflict
+        await ensure_indexes(db, status_ttl=3600)
+        await ensure_indexes(db)
+        status = await db.status_checks.index_information()
+        assert status["timestamp"]["expireAfterSeconds"] == 3600
+    asyncio.run(scenario())
+
+
+def test_changed_ttl_goes_through_coll_mod(monkeypatch):
+    changed = []
+
+    async def set_status_ttl(db, seconds):
+        changed.append(seconds)
+
+    monkeypatch.setattr(indexes, "set_status_ttl", set_status_ttl)
+
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await ensure_indexes(db, status_ttl=3600)
+        await ensure_indexes(db, status_ttl=3600)
+        await ensure_indexes(db, status_ttl=60)
+    asyncio.run(scenario())
+    assert changed == [60]
@@ -0,0 +1,61 @@
+"""Cross-worker cache invalidation: which bus messages a worker applies."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from invalidation import InvalidationBus  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self):
+        self.inserted = []
+
+    async def insert_one(self, doc):
+        self.inserted.append(doc)
+
+
+def make_bus():
+    received = []
+    return InvalidationBus(received.append), received
+
+
+def test_own_and_noop_messages_are_ignored():
+    bus, received = make_bus()
+    bus._receive({"origin": bus.worker_id, "tags": ["post:1"]})
+    bus._receive({"origin": "other", "tags": [], "noop": True})
+    assert received == [] and bus.received == 0
+
+
+def test_other_workers_messages_are_applied():
+    bus, received = make_bus()
+    bus._receive({"origin": "other", "tags": ["post:1", "facets"]})
+    bus._receive({"origin": "other", "tags": []})
+    assert received == [["post:1", "facets"], []]
+    assert bus.received == 2
+
+
+def test_resync_clears_everything():
+    bus, received = make_bus()
+    bus._resync()
+    assert received == [[]] and bus.resyncs == 1
+
+
+def test_publish_carries_the_worker_id():
+    bus, _ = make_bus()
+    collection = FakeCollection()
+    bus.collection = collection
+    asyncio.run(bus.publish(("post:1",)))
+    assert collection.inserted == [{"origin": bus.worker_id, "tags": ["post:1"]}]
+    # Workers that exchange messages apply each other's but not their own
+    other, received = make_bus()
+    other._receive(collection.inserted[0])
+    bus._receive(collection.inserted[0])
+    assert received == [["post:1"]] and bus.received == 0
+
+
+def test_publish_without_a_bus_is_a_no_op():
+    bus, _ = make_bus()
+    asyncio.run(bus.publish(["post:1"]))
+    assert bus.published == 0
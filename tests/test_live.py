@@ -0,0 +1,132 @@
+"""Live feed fan-out: replay on reconnect, resets and dropping slow clients."""
+import asyncio
+import sys
+from pathlib import Path
+
+from pymongo.errors import CollectionInvalid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from live import DROPPED, RESET, LiveFeed, event  # noqa: E402
+
+
+def make_feed(**kwargs) -> LiveFeed:
+    feed = LiveFeed(fields=["id", "title", "revision"], **kwargs)
+    # Keep the Mongo subscription out of these tests
+    feed._run = lambda: asyncio.sleep(3600)
+    return feed
+
+
+def drain(queue: asyncio.Queue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_events_reach_every_client():
+    async def scenario():
+        feed = make_feed()
+        first, second = feed.subscribe(), feed.subscribe()
+        feed._publish("1", event("delete", "abc"))
+        assert len(drain(first)) == len(drain(second)) == 1
+        await feed.stop()
+    asyncio.run(scenario())
+
+
+def test_reconnect_replays_missed_events():
+    async def scenario():
+        feed = make_feed()
+        for i in range(1, 4):
+            feed._publish(str(i), event("update", "abc", fields={"revision": i}))
+        frames = drain(feed.subscribe(last_event_id="1"))
+        assert [frame.split(b"\n")[0] for frame in frames] == [b"id: 2", b"id: 3"]
+        assert drain(feed.subscribe(last_event_id="unknown")) == [RESET]
+        await feed.stop()
+    asyncio.run(scenario())
+
+
+def test_slow_client_is_dropped():
+    async def scenario():
+        feed = make_feed(client_queue=2)
+        slow, fast = feed.subscribe(), feed.subscribe()
+        for i in range(3):
+            feed._publish(str(i), event("delete", str(i)))
+            drain(fast)
+        assert drain(slow) == [DROPPED]
+        assert feed.stats()["clients"] == 1 and feed.stats()["dropped_clients"] == 1
+        await feed.stop()
+    asyncio.run(scenario())
+
+
+def test_summary_leaves_out_content():
+    feed = make_feed()
+    assert feed.summary({"id": "abc", "title": "T", "content": "long body"}) == {"id": "abc", "title": "T"}
+
+
+class FakeEvents:
+    """Just enough of a Motor collection and its database to prepare and record"""
+
+    name = "blog_events"
+
+    def __init__(self, exists=False, capped=False):
+        self.database = self
+        self.exists, self.capped = exists, capped
+        self.calls, self.docs = [], []
+
+    async def create_collection(self, name, capped=False, size=None):
+        self.calls.append("create_collection")
+        if self.exists:
+            raise CollectionInvalid(f"collection {name} already exists")
+        self.exists, self.capped = True, capped
+
+    async def options(self):
+        return {"capped": True} if self.capped else {}
+
+    async def command(self, name, *args, **kwargs):
+        self.calls.append(name)
+        self.capped = True
+
+    async def find_one(self, *args):
+        return self.docs[0] if self.docs else None
+
+    async def insert_one(self, doc):
+        self.calls.append("insert_one")
+        self.docs.append(doc)
+
+    async def insert_many(self, docs):
+        # Inserting into a missing collection would create it uncapped
+        self.calls.append("insert_many")
+        self.exists = True
+        self.docs += docs
+
+
+def test_record_creates_the_capped_collection_first():
+    async def scenario():
+        feed, events = make_feed(), FakeEvents()
+        feed.configure(None, events)
+        await feed.record(event("delete", "abc"))
+        await feed.record(event("delete", "def"))
+        assert events.capped
+        assert events.calls == ["create_collection", "insert_one", "insert_many", "insert_many"]
+    asyncio.run(scenario())
+
+
+def test_prepare_converts_an_uncapped_collection():
+    async def scenario():
+        feed, events = make_feed(), FakeEvents(exists=True)
+        feed.configure(None, events)
+        await feed.prepare()
+        assert events.capped
+        assert events.calls == ["create_collection", "convertToCapped", "insert_one"]
+    asyncio.run(scenario())
+
+
+def test_changestream_source_records_nothing():
+    async def scenario():
+        feed, events = make_feed(source="changestream"), FakeEvents()
+        feed.configure(None, events)
+        await feed.prepare()
+        await feed.record(event("delete", "abc"))
+        assert events.calls == []
+    asyncio.run(scenario())
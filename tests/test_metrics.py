@@ -0,0 +1,161 @@
+"""Request metrics: histogram rendering, route labels, phase timings, /api/metrics and pool counters."""
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import metrics  # noqa: E402
+import server  # noqa: E402
+from metrics import Histogram, MetricsMiddleware, PoolStats, TimedRoute  # noqa: E402
+
+HANDLER_SECONDS = 0.05
+
+
+@pytest.fixture
+def histograms(monkeypatch):
+    """Fresh request histograms, so counts from other tests do not leak in"""
+    fresh = {}
+    for name in ("request_duration", "handler_duration", "serialization_duration"):
+        original = getattr(metrics, name)
+        fresh[name] = Histogram(original.name, original.documentation, original.labelnames)
+        monkeypatch.setattr(metrics, name, fresh[name])
+    return fresh
+
+
+def make_client(slow_request_seconds=None) -> TestClient:
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        time.sleep(HANDLER_SECONDS)
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(MetricsMiddleware(app, slow_request_seconds=slow_request_seconds))
+
+
+def series(histogram: Histogram) -> dict:
+    """Map each rendered sample name and labels to its value"""
+    samples = {}
+    for line in histogram.render():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram_renders_cumulative_buckets_count_and_sum():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.5, 20):
+        histogram.observe(value, "/a")
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.01"} 2',
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_sum{route="/a"} 20.515',
+    ]
+
+
+def test_label_values_are_escaped():
+    histogram = Histogram("h", "H.", ("route",), buckets=(1.0,))
+    histogram.observe(0.5, 'say "hi"\n')
+    assert 'h_count{route="say \\"hi\\"\\n"} 1' in histogram.render()
+
+
+def test_requests_are_labelled_by_route_template(histograms):
+    client = make_client()
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/wp-login.php")
+    samples = series(histograms["request_duration"])
+    assert samples['http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"}'] == 2
+    # Unknown paths share one label instead of one series each
+    assert samples['http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'] == 1
+    assert not any("wp-login" in name for name in samples)
+
+
+def test_handler_and_serialization_phases_are_split(histograms):
+    make_client().get("/items/1")
+    labels = '{method="GET",route="/items/{item_id}"}'
+    handler = series(histograms["handler_duration"])
+    serialization = series(histograms["serialization_duration"])
+    total = series(histograms["request_duration"])
+    assert handler[f"http_handler_duration_seconds_count{labels}"] == 1
+    assert handler[f"http_handler_duration_seconds_sum{labels}"] >= HANDLER_SECONDS
+    assert serialization[f"http_serialization_duration_seconds_count{labels}"] == 1
+    assert serialization[f"http_serialization_duration_seconds_sum{labels}"] < HANDLER_SECONDS
+    request_sum = total['http_request_duration_seconds_sum{method="GET",route="/items/{item_id}",status="200"}']
+    assert request_sum >= handler[f"http_handler_duration_seconds_sum{labels}"]
+
+
+def test_slow_requests_are_logged_with_their_phases(histograms, caplog):
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        make_client(slow_request_seconds=HANDLER_SECONDS / 2).get("/items/1")
+        make_client(slow_request_seconds=10).get("/items/1")
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow request")]
+    assert len(slow) == 1
+    assert re.match(r"Slow request GET /items/\{item_id\} -> 200 in [\d.]+ ms "
+                    r"\(handler [\d.]+ ms, serialization [\d.]+ ms\)$", slow[0])
+
+
+def test_metrics_endpoint_serves_the_exposition_format(monkeypatch):
+    monkeypatch.setenv("ENSURE_INDEXES", "false")
+    # mongomock has no capped collections for the tail source to record into
+    monkeypatch.setattr(server.live_feed, "source", "changestream")
+    server.db = server.read_db = AsyncMongoMockClient()["test"]
+    try:
+        with TestClient(server.create_app()) as api:
+            api.get("/api/")
+            response = api.get("/api/metrics")
+    finally:
+        server.db = server.read_db = None
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert body.endswith("\n")
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert re.search(r'^http_request_duration_seconds_bucket\{method="GET",route="/api/",status="200",le="\+Inf"\} \d+$',
+                     body, re.MULTILINE)
+    assert re.search(r'^http_handler_duration_seconds_count\{method="GET",route="/api/"\} \d+$', body, re.MULTILINE)
+    assert re.search(r"^# TYPE blog_cache_hits_total counter\nblog_cache_hits_total \d+$", body, re.MULTILINE)
+    # Every sample line is a name, optional labels and a number
+    for line in body.splitlines():
+        if not line.startswith("#"):
+            assert re.match(r'^[a-z_]+(\{[^}]*\})? -?[\d.e+-]+$', line), line
+
+
+def test_pool_stats_track_checkouts_waits_and_failures():
+    stats = PoolStats()
+    stats.connection_created(None)
+    stats.connection_created(None)
+    for _ in range(2):
+        stats.connection_check_out_started(None)
+        stats.connection_checked_out(None)
+    stats.connection_check_out_started(None)
+    assert stats.snapshot()["waiting"] == 1
+    stats.connection_check_out_failed(None)
+    stats.connection_checked_in(None)
+    stats.connection_closed(None)
+
+    snapshot = stats.snapshot()
+    assert {key: snapshot[key] for key in ("open_connections", "checked_out", "waiting", "checkouts",
+                                           "checkout_failures")} == {
+        "open_connections": 1, "checked_out": 1, "waiting": 0, "checkouts": 2, "checkout_failures": 1,
+    }
+    assert 0 <= snapshot["avg_wait_ms"] <= snapshot["max_wait_ms"]
+
+
+def test_pool_stats_without_checkouts_report_no_wait():
+    assert PoolStats().snapshot()["avg_wait_ms"] == 0.0
@@ -0,0 +1,71 @@
+"""Content-derived post fields and how updates keep them current."""
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from post_fields import backfill, content_hash, derive, update_fields  # noqa: E402
+
+CONTENT = "# Overview\n\nFirst paragraph of the post.\n\n## Results\nMore text.\n## Results\n"
+
+
+def test_derive_counts_words_and_builds_toc():
+    fields = derive(CONTENT)
+    assert fields["wordCount"] == 10
+    assert fields["readTime"] == "1 min read"
+    assert [entry["anchor"] for entry in fields["toc"]] == ["overview", "results", "results-2"]
+    assert fields["excerpt"] == "First paragraph of the post."
+    assert fields["excerptAuto"] is True
+
+
+def test_derive_keeps_author_excerpt():
+    fields = derive(CONTENT, "Hand written")
+    assert "excerpt" not in fields
+    assert fields["excerptAuto"] is False
+
+
+def test_long_excerpt_is_cut_at_a_word():
+    excerpt = derive("word " * 100)["excerpt"]
+    assert len(excerpt) <= 201 and excerpt.endswith("word…")
+
+
+def test_unchanged_content_is_not_rederived():
+    current = {"contentHash": content_hash(CONTENT), "excerpt": "Hand written", "excerptAuto": False}
+    assert update_fields({"content": CONTENT, "excerpt": "Hand written", "title": "New"}, current) == {"title": "New"}
+
+
+def test_auto_excerpt_follows_new_content():
+    current = {"contentHash": content_hash(CONTENT), "excerpt": "First paragraph of the post.", "excerptAuto": True}
+    update = update_fields({"content": "Rewritten body."}, current)
+    assert update["excerpt"] == "Rewritten body."
+    assert update["contentHash"] == content_hash("Rewritten body.")
+
+
+def test_author_excerpt_survives_new_content():
+    current = {"contentHash": content_hash(CONTENT), "excerpt": "Hand written", "excerptAuto": False}
+    update = update_fields({"content": "Rewritten body."}, current)
+    assert "excerpt" not in update and update["excerptAuto"] is False
+
+
+def test_backfill_bumps_revision_and_updated_at():
+    before = datetime(2024, 1, 1)
+
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await db.blog_posts.insert_many([
+            {"_id": 1, "content": CONTENT, "revision": 2, "updatedAt": before},
+            {"_id": 2, "content": CONTENT, "revision": 1, "updatedAt": before, **derive(CONTENT)},
+        ])
+        assert await backfill(db) == 1
+        assert await backfill(db) == 0
+        return await db.blog_posts.find_one({"_id": 1}), await db.blog_posts.find_one({"_id": 2})
+
+    old, current = asyncio.run(scenario())
+    assert old["wordCount"] == 10 and old["contentHash"] == content_hash(CONTENT)
+    # A new revision changes the post's ETag and its snapshot manifest entry
+    assert old["revision"] == 3 and old["updatedAt"] > before
+    assert current["revision"] == 1 and current["updatedAt"] == before
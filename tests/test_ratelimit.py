@@ -0,0 +1,89 @@
+"""Rate limiting: token refill, per-route buckets and 429 responses."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import ratelimit  # noqa: E402
+from ratelimit import RateLimitMiddleware, TokenBucketLimiter  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tokens_refill_at_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    limiter = TokenBucketLimiter(rate=0.5, burst=2)
+    assert limiter.hit("k") == (True, 0.0)
+    assert limiter.hit("k") == (True, 0.0)
+    allowed, retry_after = limiter.hit("k")
+    assert not allowed and retry_after == 2.0
+    clock.now += 1
+    allowed, retry_after = limiter.hit("k")
+    assert not allowed and retry_after == 1.0
+    clock.now += 1
+    assert limiter.hit("k")[0]
+    # A long idle period refills only up to the burst
+    clock.now += 3600
+    assert [limiter.hit("k")[0] for _ in range(3)] == [True, True, False]
+
+
+def test_idle_keys_are_evicted_beyond_max_keys():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2)
+    for key in "abc":
+        limiter.hit(key)
+    assert limiter.stats()["tracked_keys"] == 2
+    assert limiter.evictions == 1
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(middleware, path, client="10.0.0.1", headers=()):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "client": (client, 1234), "headers": list(headers)}
+    asyncio.run(middleware(scope, None, send))
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+ROUTES = [("POST", "/api/contact"), ("POST", "/api/status")]
+
+
+def test_over_limit_requests_get_429_with_retry_after():
+    middleware = RateLimitMiddleware(ok_app, TokenBucketLimiter(rate=0.1, burst=1), ROUTES)
+    assert call(middleware, "/api/contact")[0] == 200
+    status, headers = call(middleware, "/api/contact")
+    assert status == 429
+    assert headers[b"retry-after"] == b"10"
+    # Another client has its own bucket, and unlisted routes are not limited
+    assert call(middleware, "/api/contact", client="10.0.0.2")[0] == 200
+    assert call(middleware, "/api/other")[0] == 200
+
+
+def test_each_route_has_its_own_bucket():
+    middleware = RateLimitMiddleware(ok_app, TokenBucketLimiter(rate=0.1, burst=1), ROUTES)
+    assert call(middleware, "/api/status")[0] == 200
+    assert call(middleware, "/api/status")[0] == 429
+    assert call(middleware, "/api/contact")[0] == 200
+
+
+def test_forwarded_address_is_the_one_the_proxy_appended():
+    middleware = RateLimitMiddleware(ok_app, TokenBucketLimiter(rate=0.1, burst=1), ROUTES, trust_forwarded=True)
+    spoofed = [(b"x-forwarded-for", b"1.1.1.1, 203.0.113.7")]
+    assert call(middleware, "/api/contact", headers=spoofed)[0] == 200
+    # Changing the client-supplied part does not buy a fresh bucket
+    spoofed = [(b"x-forwarded-for", b"2.2.2.2, 203.0.113.7")]
+    assert call(middleware, "/api/contact", headers=spoofed)[0] == 429
@@ -0,0 +1,33 @@
+"""Search helpers: query terms and highlighted snippets."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from search import highlight, search_terms  # noqa: E402
+
+
+def test_search_terms_skip_negated_words_and_duplicates():
+    assert search_terms('Climate -politics "data model" climate') == ["climate", "data", "model"]
+
+
+def test_highlight_marks_word_prefixes():
+    assert highlight("Learning to learn, unlearned", ["learn"]) == (
+        "<mark>Learning</mark> to <mark>learn</mark>, unlearned"
+    )
+
+
+def test_highlight_escapes_html():
+    assert highlight("<b>graph</b> & more", ["graph"]) == "&lt;b&gt;<mark>graph</mark>&lt;/b&gt; &amp; more"
+
+
+def test_highlight_windows_long_text_around_the_first_match():
+    text = " ".join(["filler"] * 60) + " quantum result " + " ".join(["tail"] * 60)
+    snippet = highlight(text, ["quantum"], width=80)
+    assert snippet.startswith("…filler") and snippet.endswith("…")
+    assert "<mark>quantum</mark>" in snippet
+
+
+def test_highlight_without_terms_or_text():
+    assert highlight("", ["x"]) == ""
+    assert highlight("a" * 300, [], width=10) == "a" * 10
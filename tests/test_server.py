@@ -0,0 +1,539 @@
+"""API behaviour against an in-memory Mongo stand-in (mongomock-motor)."""
+import asyncio
+import base64
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+from typer.testing import CliRunner  # noqa: E402
+
+import cli  # noqa: E402
+import server  # noqa: E402
+from post_fields import content_hash  # noqa: E402
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("ENSURE_INDEXES", "false")
+    # mongomock has no capped collections for the tail source to record into
+    monkeypatch.setattr(server.live_feed, "source", "changestream")
+    server.db = server.read_db = AsyncMongoMockClient()["test"]
+    server.read_cache.clear()
+    with TestClient(server.create_app()) as client:
+        yield client
+    server.db = server.read_db = None
+
+
+def create_post(api, title="A post", category="Research", **fields):
+    body = dict(title=title, category=category, content="Some words here.", tags=["a"], **fields)
+    response = api.post("/api/blog/posts", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+def encode(payload) -> str:
+    raw = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Listing cursors
+
+def test_cursor_pages_through_every_post(api):
+    ids = {create_post(api, title=f"Post {i}")["id"] for i in range(5)}
+    seen, cursor = [], None
+    while True:
+        response = api.get("/api/blog/posts", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [post["id"] for post in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(ids) and set(seen) == ids
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    encode(b"not json"),
+    encode({"d": "2026-01-01T00:00:00"}),
+    encode({"d": "yesterday", "id": "0" * 24}),
+    encode({"d": "2026-01-01T00:00:00", "id": "not-an-object-id"}),
+    encode(["a", "list"]),
+])
+def test_malformed_or_tampered_cursor_is_rejected(api, cursor):
+    response = api.get("/api/blog/posts", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+# Read cache
+
+def test_read_overlapping_a_write_is_not_cached():
+    server.read_cache.clear()
+    version = server.blog_version.counter
+    server.apply_invalidation([server.post_tag("1")])
+    server.cache_if_unchanged(version, ("post", "1"), {"title": "before the write"}, [server.post_tag("1")])
+    assert server.read_cache.get(("post", "1")) is None
+
+    server.cache_if_unchanged(server.blog_version.counter, ("post", "1"), {"title": "after"}, [server.post_tag("1")])
+    assert server.read_cache.get(("post", "1")) == {"title": "after"}
+
+
+def test_listing_is_served_from_cache_until_a_write(api):
+    create_post(api, title="First")
+    assert [post["title"] for post in api.get("/api/blog/posts").json()] == ["First"]
+    hits = server.read_cache.hits
+    api.get("/api/blog/posts")
+    assert server.read_cache.hits == hits + 1
+    create_post(api, title="Second")
+    assert [post["title"] for post in api.get("/api/blog/posts").json()] == ["Second", "First"]
+
+
+def test_facets_are_not_cached_while_the_seed_runs(api, monkeypatch):
+    create_post(api, category="Research")
+    monkeypatch.setattr(server, "facets_seeding", True)
+    categories = api.get("/api/blog/categories")
+    assert categories.json() == {"categories": ["Research"]}
+    facets = api.get("/api/blog/facets")
+    assert facets.status_code == 503 and "cache-control" not in facets.headers
+    assert server.read_cache.get(("facets",)) is None
+
+
+def test_seed_evicts_facets_cached_before_it(api):
+    create_post(api, category="Research")
+    asyncio.run(server.db.blog_facets.delete_many({}))
+    assert api.get("/api/blog/facets").json()["categories"] == []
+    asyncio.run(server.seed_blog_facets())
+    assert not server.facets_seeding
+    assert [facet["name"] for facet in api.get("/api/blog/facets").json()["categories"]] == ["Research"]
+
+
+def test_cached_and_validated_reads_come_from_the_primary(api):
+    post = create_post(api, category="Research")
+    # A secondary that has not caught up with the write yet
+    server.read_db = AsyncMongoMockClient()["lagging"]
+    server.read_cache.clear()
+    assert [entry["id"] for entry in api.get("/api/blog/posts").json()] == [post["id"]]
+    assert api.get(f"/api/blog/posts/{post['id']}").status_code == 200
+    assert api.get("/api/blog/categories").json() == {"categories": ["Research"]}
+    # Admin stats are neither cached per version nor validated, so they may lag
+    assert api.get("/api/admin/stats/contacts").status_code == 200
+
+
+# Health
+
+def test_health_reports_ping_and_pool(api):
+    body = api.get("/api/health").json()
+    assert body["status"] == "ok"
+    assert body["mongo"]["read_preference"] == "primary" and body["mongo"]["ping_ms"] >= 0
+    assert set(body["pool"]) == {
+        "open_connections", "checked_out", "waiting", "checkouts", "checkout_failures", "avg_wait_ms", "max_wait_ms",
+    }
+
+
+class UnreachableAdmin:
+    async def command(self, name):
+        raise server.PyMongoError("No servers available")
+
+
+def test_health_is_503_when_mongo_is_unreachable(api):
+    server.db = type("Db", (), {"client": type("Client", (), {"admin": UnreachableAdmin()})()})()
+    response = api.get("/api/health")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable", "error": "No servers available"}
+
+
+# Conditional requests
+
+def conditional_request(**headers):
+    return server.Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+LAST_MODIFIED = server.datetime(2026, 1, 2, 3, 4, 5)
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    ('"abc-2"', True),
+    ('W/"abc-2"', True),
+    ('"other", W/"abc-2"', True),
+    ('*', True),
+    ('"abc-1"', False),
+    ('W/"abc-1"', False),
+])
+def test_if_none_match_uses_weak_comparison(if_none_match, expected):
+    request = conditional_request(if_none_match=if_none_match)
+    assert server.is_not_modified(request, '"abc-2"', LAST_MODIFIED) is expected
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = conditional_request(if_none_match='"abc-1"', if_modified_since="Fri, 02 Jan 2026 03:04:05 GMT")
+    assert not server.is_not_modified(request, '"abc-2"', LAST_MODIFIED)
+
+
+@pytest.mark.parametrize("if_modified_since, expected", [
+    ("Fri, 02 Jan 2026 03:04:05 GMT", True),
+    ("Sat, 03 Jan 2026 00:00:00 GMT", True),
+    ("Thu, 01 Jan 2026 00:00:00 GMT", False),
+    ("not a date", False),
+])
+def test_if_modified_since(if_modified_since, expected):
+    request = conditional_request(if_modified_since=if_modified_since)
+    assert server.is_not_modified(request, '"abc-2"', LAST_MODIFIED.replace(microsecond=500)) is expected
+
+
+def test_if_match_uses_strong_comparison():
+    post = {"_id": "abc", "revision": 2}
+    assert server.if_match_satisfied('"abc-2"', post)
+    assert server.if_match_satisfied('*', post)
+    assert not server.if_match_satisfied('W/"abc-2"', post)
+
+
+def test_unchanged_post_gets_304(api):
+    post = create_post(api)
+    response = api.get(f"/api/blog/posts/{post['id']}")
+    etag = response.headers["ETag"]
+    assert api.get(f"/api/blog/posts/{post['id']}", headers={"If-None-Match": etag}).status_code == 304
+    assert api.get(f"/api/blog/posts/{post['id']}", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+
+# Search
+
+class MissingTextIndex:
+    """blog_posts stand-in whose $text queries fail like a server without blog_text"""
+
+    def find(self, *args, **kwargs):
+        return self
+
+    def sort(self, *args):
+        return self
+
+    def skip(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def to_list(self, length):
+        raise server.OperationFailure("text index required for $text query", code=27)
+
+
+def test_search_without_text_index_is_unavailable(api, monkeypatch):
+    monkeypatch.setattr(server, "read_db", type("Db", (), {"blog_posts": MissingTextIndex()})())
+    response = api.get("/api/blog/search", params={"q": "climate"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+
+
+# Deletes
+
+def test_delete_missing_or_invalid_id_is_404(api):
+    assert api.delete("/api/blog/posts/not-an-id").status_code == 404
+    assert api.delete(f"/api/blog/posts/{'0' * 24}").status_code == 404
+
+
+def test_failure_after_delete_is_not_reported_as_404(monkeypatch):
+    monkeypatch.setenv("ENSURE_INDEXES", "false")
+    # mongomock has no capped collections for the tail source to record into
+    monkeypatch.setattr(server.live_feed, "source", "changestream")
+    server.db = server.read_db = AsyncMongoMockClient()["test"]
+
+    async def broken_facets(db, posts):
+        raise server.PyMongoError("facet write failed")
+
+    with TestClient(server.create_app(), raise_server_exceptions=False) as api:
+        post = create_post(api)
+        # Cached, so the 404 below shows the failed facet write still invalidated it
+        assert api.get(f"/api/blog/posts/{post['id']}").status_code == 200
+        listing = api.get("/api/blog/posts")
+        monkeypatch.setattr(server.facets, "posts_removed", broken_facets)
+        assert api.delete(f"/api/blog/posts/{post['id']}").status_code == 500
+        assert api.get(f"/api/blog/posts/{post['id']}").status_code == 404
+        after = api.get("/api/blog/posts", headers={"If-None-Match": listing.headers["ETag"]})
+        assert after.status_code == 200 and after.json() == []
+    server.db = server.read_db = None
+
+
+def test_listing_etag_holds_across_workers_and_restarts(api, monkeypatch):
+    post = create_post(api, title="First")
+    for view in ("full", "summary"):
+        etag = api.get("/api/blog/posts", params={"view": view}).headers["ETag"]
+        # Another worker, or this one after a restart: empty cache, fresh counter
+        server.read_cache.clear()
+        monkeypatch.setattr(server, "blog_version", server.BlogVersion())
+        again = api.get("/api/blog/posts", params={"view": view}, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+
+    etag = api.get("/api/blog/posts").headers["ETag"]
+    api.put(f"/api/blog/posts/{post['id']}", json={"title": "Edited"})
+    edited = api.get("/api/blog/posts", headers={"If-None-Match": etag})
+    assert edited.status_code == 200 and edited.headers["ETag"] != etag
+
+
+# Bulk import and export
+
+def test_bulk_import_mixes_zulu_and_missing_dates(api):
+    listed = api.get("/api/blog/posts").json()
+    assert listed == []
+    items = [
+        {"title": "Dated", "category": "Research", "content": "Old words.", "date": "2024-03-01T10:00:00Z"},
+        {"title": "Undated", "category": "Research", "content": "New words."},
+    ]
+    response = api.post("/api/blog/posts/bulk", json=items)
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 2
+    posts = api.get("/api/blog/posts").json()
+    assert [post["title"] for post in posts] == ["Undated", "Dated"]
+    assert posts[1]["date"].startswith("2024-03-01T10:00:00")
+    assert api.get("/api/blog/categories").json() == {"categories": ["Research"]}
+
+
+def import_item(title, **fields):
+    return dict({"title": title, "category": "Research", "content": "Some words here."}, **fields)
+
+
+def test_bulk_import_reports_invalid_items_by_index(api):
+    items = [import_item("One"), {"category": "Research", "content": "No title."}, import_item("Three"),
+             import_item("Four", date="not a date")]
+    result = api.post("/api/blog/posts/bulk", json=items).json()
+    assert result["inserted"] == 2 and len(result["ids"]) == 2
+    assert [error["index"] for error in result["errors"]] == [1, 3]
+    assert result["errors"][0]["message"].startswith("title:")
+    assert result["errors"][1]["message"].startswith("date:")
+
+
+def test_bulk_import_maps_write_errors_to_request_indexes(api):
+    asyncio.run(server.db.blog_posts.create_index("title", unique=True))
+    items = [{"content": "Invalid, skipped."}, import_item("Same"), import_item("Same"), import_item("Other")]
+    result = api.post("/api/blog/posts/bulk", json=items).json()
+    assert result["inserted"] == 2
+    # The duplicate is docs[1] of the insert but item 2 of the request
+    assert [error["index"] for error in result["errors"]] == [0, 2]
+    assert "E11000" in result["errors"][1]["message"]
+    assert api.get("/api/blog/facets").json()["categories"][0]["count"] == 2
+
+
+def test_bulk_import_over_the_limit_is_413(api, monkeypatch):
+    monkeypatch.setattr(server, "BULK_MAX_ITEMS", 2)
+    response = api.post("/api/blog/posts/bulk", json=[import_item(str(i)) for i in range(3)])
+    assert response.status_code == 413
+    assert asyncio.run(server.db.blog_posts.count_documents({})) == 0
+
+
+def test_export_streams_one_post_per_line_oldest_first(api, monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 2)
+    ids = [create_post(api, title=f"Post {i}")["id"] for i in range(5)]
+    response = api.get("/api/blog/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.endswith("\n") and not response.text.endswith("\n\n")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == ids
+
+
+class ApiSession:
+    """Stands in for requests.Session, sending the CLI's requests to the test app"""
+
+    def __init__(self, api):
+        self.api = api
+        self.batches = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def post(self, url, json):
+        self.batches.append(len(json))
+        return self.api.post(url, json=json)
+
+
+def test_cli_imports_in_batches_and_numbers_errors_across_them(api, monkeypatch, tmp_path):
+    session = ApiSession(api)
+    monkeypatch.setattr(cli.requests, "Session", lambda: session)
+    items = [import_item(f"Post {i}") for i in range(5)]
+    items[3] = {"category": "Research"}
+    path = tmp_path / "posts.ndjson"
+    path.write_text("".join(json.dumps(item) + "\n\n" for item in items))
+
+    result = CliRunner().invoke(cli.app, [
+        "import-posts", str(path), "--api-url", "http://testserver/api", "--batch-size", "2",
+    ])
+    assert session.batches == [2, 2, 1]
+    assert result.exit_code == 1
+    assert "post 3: title:" in result.output and "Imported 4 posts, 1 failed" in result.output
+
+
+def test_cli_reads_blog_json(tmp_path):
+    path = tmp_path / "blog.json"
+    path.write_text(json.dumps({"posts": [import_item("A"), import_item("B")]}))
+    assert [post["title"] for post in cli.read_posts(path)] == ["A", "B"]
+
+
+# Write side effects
+
+def test_write_side_effects_overlap_and_facets_land_before_invalidation(monkeypatch):
+    order = []
+
+    async def scenario():
+        recorded = asyncio.Event()
+
+        async def facet_update():
+            # Only finishes if the live event is recorded meanwhile
+            await asyncio.wait_for(recorded.wait(), 1)
+            order.append("facets")
+
+        async def record(*events):
+            order.append("live")
+            recorded.set()
+
+        async def blog_changed(*tags):
+            order.append("caches")
+
+        monkeypatch.setattr(server.live_feed, "record", record)
+        monkeypatch.setattr(server, "blog_changed", blog_changed)
+        await server.post_written(facet_update(), ["facets"], server.event("delete", "1"))
+
+    asyncio.run(scenario())
+    assert order == ["live", "facets", "caches"]
+
+
+# Updates
+
+def stored(**fields):
+    return dict({"_id": "abc", "revision": 3, "title": "T", "category": "Research", "tags": ["a", "b"],
+                 "content": "Body text.", "excerpt": "Body text.", "excerptAuto": True}, **fields)
+
+
+def test_post_changes_keeps_only_differing_fields():
+    update = server.BlogPostUpdate(title="T", category="News")
+    assert server.post_changes(update, stored()) == {"category": "News"}
+    assert server.post_changes(server.BlogPostUpdate(title="T"), stored()) == {}
+
+
+def test_post_changes_applies_tag_edits_to_the_stored_list():
+    update = server.BlogPostUpdate(addTags=["c", "a", "c"], removeTags=["b"])
+    assert server.post_changes(update, stored()) == {"tags": ["a", "c"]}
+    # Explicit tags are the base for the edits
+    update = server.BlogPostUpdate(tags=["x"], addTags=["y"])
+    assert server.post_changes(update, stored()) == {"tags": ["x", "y"]}
+
+
+def test_post_changes_derives_fields_when_content_changes():
+    current = stored(contentHash=content_hash("Body text."))
+    changes = server.post_changes(server.BlogPostUpdate(content="New body here."), current)
+    assert changes["content"] == "New body here."
+    assert changes["wordCount"] == 3
+    # The generated excerpt follows the content
+    assert changes["excerpt"] == "New body here."
+    assert server.post_changes(server.BlogPostUpdate(content="Body text."), current) == {}
+
+
+class FindOneCounter:
+    def __init__(self, monkeypatch):
+        self.calls = 0
+        collection_type = type(server.db.blog_posts)
+        original = collection_type.find_one
+
+        def find_one(collection, *args, **kwargs):
+            if collection.name == "blog_posts":
+                self.calls += 1
+            return original(collection, *args, **kwargs)
+
+        monkeypatch.setattr(collection_type, "find_one", find_one)
+
+
+def test_update_with_stale_revision_is_409_with_current_etag(api):
+    post = create_post(api)
+    first = api.put(f"/api/blog/posts/{post['id']}", json={"title": "Edited", "revision": 1})
+    assert first.status_code == 200 and first.json()["revision"] == 2
+    stale = api.put(f"/api/blog/posts/{post['id']}", json={"title": "Again", "revision": 1})
+    assert stale.status_code == 409
+    assert stale.headers["ETag"] == f'"{post["id"]}-2"'
+    stale = api.patch(f"/api/blog/posts/{post['id']}", json={"title": "Again"}, headers={"If-Match": f'"{post["id"]}-1"'})
+    assert stale.status_code == 409
+    assert api.get(f"/api/blog/posts/{post['id']}").json()["title"] == "Edited"
+
+
+def test_update_of_missing_post_is_404(api):
+    assert api.put(f"/api/blog/posts/{'0' * 24}", json={"title": "x"}).status_code == 404
+    assert api.put("/api/blog/posts/nope", json={"title": "x"}).status_code == 404
+
+
+def test_update_from_a_cached_copy_is_one_write_without_a_read(api, monkeypatch):
+    post = create_post(api)
+    api.get("/api/blog/posts")  # full listing caches each post
+    counter = FindOneCounter(monkeypatch)
+    response = api.put(f"/api/blog/posts/{post['id']}", json={"title": "Edited", "revision": 1})
+    assert response.status_code == 200 and response.json()["title"] == "Edited"
+    assert counter.calls == 0
+
+
+def test_update_from_a_stale_cached_copy_rereads(api):
+    post = create_post(api)
+    api.get(f"/api/blog/posts/{post['id']}")
+    # A write the read cache never heard of, e.g. from another worker without the bus
+    asyncio.run(server.db.blog_posts.update_one(
+        {"_id": server.ObjectId(post["id"])}, {"$set": {"title": "Elsewhere"}, "$inc": {"revision": 1}}
+    ))
+    conditional = api.put(f"/api/blog/posts/{post['id']}", json={"category": "News", "revision": 1})
+    assert conditional.status_code == 409
+    unconditional = api.put(f"/api/blog/posts/{post['id']}", json={"category": "News"})
+    assert unconditional.status_code == 200
+    assert unconditional.json()["title"] == "Elsewhere" and unconditional.json()["revision"] == 3
+
+
+def test_no_op_update_does_not_write(api):
+    post = create_post(api)
+    response = api.put(f"/api/blog/posts/{post['id']}", json={"title": post["title"], "revision": 1})
+    assert response.status_code == 200 and response.json()["revision"] == 1
+
+
+def interleave_write(monkeypatch):
+    """Make the next guarded update lose a race against another tag edit"""
+    collection_type = type(server.db.blog_posts)
+    original = collection_type.find_one_and_update
+    pending = {"race": True}
+
+    async def racing(collection, filter, update, *args, **kwargs):
+        if pending.pop("race", False):
+            await collection.update_one({"_id": filter["_id"]}, {"$inc": {"revision": 1}, "$addToSet": {"tags": "w"}})
+        return await original(collection, filter, update, *args, **kwargs)
+
+    monkeypatch.setattr(collection_type, "find_one_and_update", racing)
+
+
+def test_unconditional_update_losing_a_race_is_recomputed(api, monkeypatch):
+    post = create_post(api)
+    interleave_write(monkeypatch)
+    response = api.patch(f"/api/blog/posts/{post['id']}", json={"addTags": ["q"]})
+    assert response.status_code == 200
+    assert response.json()["tags"] == ["a", "w", "q"] and response.json()["revision"] == 3
+
+
+def test_conditional_update_losing_a_race_is_409(api, monkeypatch):
+    post = create_post(api)
+    interleave_write(monkeypatch)
+    response = api.patch(f"/api/blog/posts/{post['id']}", json={"addTags": ["q"], "revision": 1})
+    assert response.status_code == 409
+    assert response.headers["ETag"] == f'"{post["id"]}-2"'
+
+
+# Invalidation from other workers
+
+def test_apply_invalidation_evicts_tags_or_everything():
+    server.read_cache.clear()
+    server.read_cache.set(("post", "1"), {}, [server.post_tag("1")])
+    server.read_cache.set(("post", "2"), {}, [server.post_tag("2")])
+    version = server.blog_version.counter
+    server.apply_invalidation([server.post_tag("1")])
+    assert server.read_cache.get(("post", "1")) is None and server.read_cache.get(("post", "2")) == {}
+    server.apply_invalidation([])
+    assert len(server.read_cache) == 0
+    assert server.blog_version.counter == version + 2
@@ -0,0 +1,105 @@
+"""Incremental static snapshot: revision manifest, stale files and blog.json."""
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from server import BlogPostSummary  # noqa: E402
+from snapshot import SUMMARY_PROJECTION, generate_snapshot, write_blog_json, write_if_changed  # noqa: E402
+
+
+def post(i: int, **fields) -> dict:
+    return dict({
+        "title": f"Post {i}", "category": "Research" if i % 2 else "News", "date": datetime(2026, 1, i),
+        "excerpt": "Short.", "content": "Body.", "tags": [], "readTime": "1 min read", "wordCount": 1,
+        "author": "A", "revision": 1,
+    }, **fields)
+
+
+def run(db, out_dir, page_size=2):
+    return asyncio.run(generate_snapshot(db, out_dir, page_size))
+
+
+def test_second_run_rewrites_only_changed_posts_and_removes_deleted_ones(tmp_path):
+    db = AsyncMongoMockClient()["test"]
+    ids = asyncio.run(db.blog_posts.insert_many([post(i) for i in range(1, 6)])).inserted_ids
+    first = run(db, tmp_path)
+    assert first == {"posts": 5, "posts_written": 5, "posts_removed": 0, "pages_written": 3}
+    assert run(db, tmp_path) == {"posts": 5, "posts_written": 0, "posts_removed": 0, "pages_written": 0}
+
+    asyncio.run(db.blog_posts.update_one({"_id": ids[0]}, {"$set": {"title": "Edited"}, "$inc": {"revision": 1}}))
+    asyncio.run(db.blog_posts.delete_many({"_id": {"$in": ids[3:]}}))
+    second = run(db, tmp_path)
+    assert second["posts"] == 3 and second["posts_written"] == 1 and second["posts_removed"] == 2
+
+    posts_dir = tmp_path / "posts"
+    assert sorted(path.stem for path in posts_dir.glob("*.json")) == sorted(str(i) for i in ids[:3])
+    assert json.loads((posts_dir / f"{ids[0]}.json").read_text())["title"] == "Edited"
+    # Five posts needed three pages of two; three need two
+    assert sorted(path.name for path in (tmp_path / "index").glob("*.json")) == ["page-1.json", "page-2.json"]
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["posts"] == {str(ids[0]): 2, str(ids[1]): 1, str(ids[2]): 1}
+
+
+def test_unchanged_revision_with_a_missing_file_is_rewritten(tmp_path):
+    db = AsyncMongoMockClient()["test"]
+    post_id = asyncio.run(db.blog_posts.insert_one(post(1))).inserted_id
+    run(db, tmp_path)
+    (tmp_path / "posts" / f"{post_id}.json").unlink()
+    assert run(db, tmp_path)["posts_written"] == 1
+
+
+def test_posts_checked_but_identical_are_not_counted_as_written(tmp_path):
+    db = AsyncMongoMockClient()["test"]
+    asyncio.run(db.blog_posts.insert_many([post(1), post(2)]))
+    run(db, tmp_path)
+    # Without a manifest every post is fetched again, but no file changes
+    (tmp_path / "manifest.json").unlink()
+    assert run(db, tmp_path)["posts_written"] == 0
+
+
+def test_summary_projection_matches_the_api_summary():
+    # Index pages must carry the same fields as /api/blog/posts?view=summary;
+    # mongomock adds _id to a projection it is given, so that is left out
+    projected = set(SUMMARY_PROJECTION) - {"_id"}
+    assert projected == set(BlogPostSummary.model_fields) - {"id"} | {"revision"}
+
+
+def test_index_pages_carry_summaries_in_listing_order(tmp_path):
+    db = AsyncMongoMockClient()["test"]
+    asyncio.run(db.blog_posts.insert_many([post(i) for i in range(1, 4)]))
+    run(db, tmp_path)
+    page = json.loads((tmp_path / "index" / "page-1.json").read_text())
+    assert [entry["title"] for entry in page["posts"]] == ["Post 3", "Post 2"]
+    assert page["next"] == "page-2.json" and page["pages"] == 2
+    assert "content" not in page["posts"][0] and "revision" not in page["posts"][0]
+    assert page["posts"][0]["date"] == "2026-01-03T00:00:00Z"
+    assert page["posts"][0]["wordCount"] == 1
+    categories = json.loads((tmp_path / "categories.json").read_text())
+    assert categories["Research"]["count"] == 2 and categories["Research"]["pages"] == [1, 2]
+
+
+def test_write_if_changed_skips_identical_bytes(tmp_path):
+    path = tmp_path / "nested" / "data.json"
+    assert write_if_changed(path, {"a": 1})
+    assert not write_if_changed(path, {"a": 1})
+    assert write_if_changed(path, {"a": 2})
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_blog_json_is_only_replaced_when_it_changes(tmp_path):
+    db = AsyncMongoMockClient()["test"]
+    asyncio.run(db.blog_posts.insert_many([post(1), post(2)]))
+    path = tmp_path / "blog.json"
+    assert asyncio.run(write_blog_json(db, path))
+    assert [entry["title"] for entry in json.loads(path.read_text())["posts"]] == ["Post 2", "Post 1"]
+    assert not asyncio.run(write_blog_json(db, path))
+    asyncio.run(db.blog_posts.insert_one(post(3)))
+    assert asyncio.run(write_blog_json(db, path))
+    assert len(json.loads(path.read_text())["posts"]) == 3
+    assert not list(tmp_path.glob("*.tmp"))